@@ -2,10 +2,15 @@ from flask import Flask, render_template, jsonify, request
 from routes.main import main_bp
 from routes.api import api_bp
 from routes.pages import pages
-from services.shopify_service import ShopifyService
+from routes.webhooks import webhooks_bp
+from services.client_registry import get_client_registry, get_client_registry_stats
 from services.gemini_service import GeminiService
 from services.image_service import ImageService
 from services.platform_service import PlatformService
+from services.rate_limiter import get_rate_limit_stats
+from services.analytics_cache import get_analytics_cache_stats
+from services.prewarm import get_prewarm_stats
+from services.single_flight import get_single_flight_stats
 from dotenv import load_dotenv
 import os
 from flask_session import Session
@@ -150,6 +155,7 @@ def create_app():
     app.register_blueprint(pages)  # Pages blueprint for dashboard and analytics
     app.register_blueprint(main_bp)  # Main blueprint for landing and marketing pages
     app.register_blueprint(auth_bp)
+    app.register_blueprint(webhooks_bp)  # Shopify webhooks (HMAC-verified, no login)
     
     # Load configuration
     app.config.from_object(Config)
@@ -160,7 +166,7 @@ def create_app():
     # Initialize services
     with app.app_context():
         try:
-            app.shopify_service = ShopifyService()
+            app.shopify_service = get_client_registry().default()  # Client of the configured store
             app.gemini_service = GeminiService()
             app.image_service = ImageService()
             app.platform_service = PlatformService()
@@ -184,6 +190,14 @@ def create_app():
             "timestamp": datetime.utcnow().isoformat(),
             "checks": health_status
         }
+        if hasattr(app, 'shopify_service'):
+            response["shopify_pool"] = app.shopify_service.get_pool_stats()
+            response["shopify_cache"] = app.shopify_service.get_cache_stats()
+        response["shopify_rate_limit"] = get_rate_limit_stats()
+        response["analytics_cache"] = get_analytics_cache_stats()
+        response["analytics_prewarm"] = get_prewarm_stats()
+        response["single_flight"] = get_single_flight_stats()
+        response["shopify_clients"] = get_client_registry_stats()
         return jsonify(response), status_code
     
     # Register error handlers
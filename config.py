@@ -33,6 +33,47 @@ class Config:
     ACCESS_TOKEN = os.environ.get('SHOPIFY_ACCESS_TOKEN')
     API_VERSION = os.environ.get('SHOPIFY_API_VERSION', '2024-04')
     SHOPIFY_BASE_URL = f"https://{SHOP_URL}/admin/api/{API_VERSION}"
+    SHOPIFY_POOL_MAXSIZE = int(os.environ.get('SHOPIFY_POOL_MAXSIZE', 10))
+    SHOPIFY_TIMEOUT = (
+        float(os.environ.get('SHOPIFY_CONNECT_TIMEOUT', 5)),
+        float(os.environ.get('SHOPIFY_READ_TIMEOUT', 30))
+    )
+
+    # Per-store client registry: clients kept per worker and seconds before an idle one is closed
+    SHOPIFY_MAX_CLIENTS = int(os.environ.get('SHOPIFY_MAX_CLIENTS', 32))
+    SHOPIFY_CLIENT_IDLE_TIMEOUT = int(os.environ.get('SHOPIFY_CLIENT_IDLE_TIMEOUT', 900))
+
+    # Local SQLite catalog mirror
+    CATALOG_MIRROR_ENABLED = os.environ.get('CATALOG_MIRROR_ENABLED', 'True').lower() == 'true'
+    CATALOG_DB_PATH = os.environ.get('CATALOG_DB_PATH', 'catalog.sqlite3')
+    CATALOG_SYNC_INTERVAL = int(os.environ.get('CATALOG_SYNC_INTERVAL', 60))
+    CATALOG_RECONCILE_INTERVAL = int(os.environ.get('CATALOG_RECONCILE_INTERVAL', 3600))
+
+    # Daily order rollups (stored in the same SQLite database)
+    ORDER_ROLLUPS_ENABLED = os.environ.get('ORDER_ROLLUPS_ENABLED', 'True').lower() == 'true'
+    ROLLUP_REFRESH_INTERVAL = int(os.environ.get('ROLLUP_REFRESH_INTERVAL', 60))
+
+    # Bulk product deletion jobs: product deletes in flight at once per job
+    BULK_DELETE_CONCURRENCY = int(os.environ.get('BULK_DELETE_CONCURRENCY', 8))
+
+    # Coalesce concurrent identical Shopify reads (across workers when REDIS_URL is set)
+    SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+
+    # Shopify webhooks: the app's API secret key, used to verify X-Shopify-Hmac-Sha256
+    SHOPIFY_WEBHOOK_SECRET = os.environ.get('SHOPIFY_WEBHOOK_SECRET')
+
+    # Analytics result cache (in-process LRU, shared through Redis when REDIS_URL is set)
+    ANALYTICS_CACHE_ENABLED = os.environ.get('ANALYTICS_CACHE_ENABLED', 'True').lower() == 'true'
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 300))
+    ANALYTICS_CACHE_SIZE = int(os.environ.get('ANALYTICS_CACHE_SIZE', 256))
+    # Points per daily chart on the analytics page; longer ranges are downsampled
+    ANALYTICS_CHART_POINTS = int(os.environ.get('ANALYTICS_CHART_POINTS', 120))
+
+    # Background analytics pre-warming for stores with recent analytics activity
+    PREWARM_ENABLED = os.environ.get('PREWARM_ENABLED', 'True').lower() == 'true'
+    PREWARM_INTERVAL = int(os.environ.get('PREWARM_INTERVAL', 240))
+    PREWARM_ACTIVE_WINDOW = int(os.environ.get('PREWARM_ACTIVE_WINDOW', 1800))
+    PREWARM_TIME_RANGES = tuple(os.environ.get('PREWARM_TIME_RANGES', '30d').split(','))
     
     # Gemini Configuration
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
@@ -52,9 +93,10 @@ class Config:
     
     # Session Configuration
     SESSION_TYPE = 'filesystem'  # Default to filesystem
-    if os.environ.get('REDIS_URL'):
+    REDIS_URL = os.environ.get('REDIS_URL')
+    if REDIS_URL:
         SESSION_TYPE = 'redis'
-        SESSION_REDIS = os.environ.get('REDIS_URL')
+        SESSION_REDIS = REDIS_URL
         SESSION_USE_SIGNER = True
     
     SESSION_PERMANENT = False
@@ -1,18 +1,22 @@
-from flask import Blueprint, jsonify, request, current_app
-from services.shopify_service import ShopifyService
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context, g
+from services.client_registry import get_client_registry, StoreDisconnectedError
+from services.shopify_service import ShopifyService, DASHBOARD_PAGE_SIZE
 from services.gemini_service import GeminiService
 from services.image_service import ImageService
 from services.platform_service import PlatformService
 from services.content_service import ContentService
+from services.bulk_delete import get_bulk_delete_jobs
+from services.export_service import EXPORT_FORMATS, PRODUCT_EXPORT_FIELDS, ORDER_EXPORT_FIELDS, iter_export, iter_guarded, parse_fields
 import google.generativeai as genai
 import os
 import json
 import random
 import string
-from flask_restx import Api, Resource, fields, Namespace
+from flask_restx import Api, Resource, fields, Namespace, marshal
 from flask import session
 from datetime import datetime
 import time
+from urllib.parse import urlencode
 
 # Create blueprint first
 api_bp = Blueprint('api', __name__)
@@ -90,6 +94,13 @@ analytics_ns = Namespace(
 )
 api.add_namespace(analytics_ns)
 
+# Create export namespace
+export_ns = Namespace(
+    'export',
+    description='Streaming NDJSON/CSV exports of the catalog and order history'
+)
+api.add_namespace(export_ns)
+
 # Analytics models
 analytics_time_range = analytics_ns.model('TimeRange', {
     'time_range': fields.String(
@@ -108,6 +119,7 @@ product_analytics = analytics_ns.model('ProductAnalytics', {
 
 order_analytics = analytics_ns.model('OrderAnalytics', {
     'summary': fields.Raw(description='Summary of order metrics'),
+    'previous_period': fields.Raw(description='Order metrics of the preceding period of equal length'),
     'daily_metrics': fields.List(fields.Raw, description='Daily order metrics')
 })
 
@@ -128,21 +140,27 @@ dashboard_summary = analytics_ns.model('DashboardSummary', {
     'orders': fields.Raw(description='Order metrics summary'),
     'themes': fields.Raw(description='Theme metrics summary'),
     'performance': fields.Raw(description='Performance metrics summary'),
-    'time_range': fields.String(description='Time range of the analytics')
+    'time_range': fields.String(description='Time range of the analytics'),
+    'sections': fields.Raw(description='Per-section status (ok, timeout or error)'),
+    'elapsed': fields.Float(description='Seconds taken to build the summary'),
+    'daily_metrics': fields.List(fields.Raw, description='Daily order metrics for the charts')
 })
 
 def get_shopify_service():
-    """Get or create ShopifyService instance"""
-    if not hasattr(current_app, 'shopify_service'):
-        current_app.shopify_service = ShopifyService()
-    return current_app.shopify_service
+    """Get the Shopify client of the store this request works on"""
+    return get_client_registry().current()
+
+@api.errorhandler(StoreDisconnectedError)
+def handle_store_disconnected(error):
+    """The session's store lost its token; ask the user to reconnect instead of serving another store"""
+    return {'message': str(error), 'error_code': 'STORE_DISCONNECTED'}, 401
 
 def get_analytics_service():
-    """Get or create AnalyticsService instance"""
-    if not hasattr(current_app, 'analytics_service'):
+    """Get the AnalyticsService of this request, bound to the request's store"""
+    if 'analytics_service' not in g:
         from services.analytics_service import AnalyticsService
-        current_app.analytics_service = AnalyticsService()
-    return current_app.analytics_service
+        g.analytics_service = AnalyticsService(get_shopify_service())
+    return g.analytics_service
 
 # Enhanced error models
 error_response = api.model('ErrorResponse', {
@@ -210,20 +228,73 @@ store_connection_response = api.model('StoreConnectionResponse', {
 @products_ns.route('/')
 class ProductList(Resource):
     @products_ns.doc(
-        description='List all products in your Shopify store',
+        description='List products in your Shopify store, one page at a time. The next page is '
+                    'linked in the Link header (rel="next") and its cursor is sent in X-Next-Cursor.',
+        params={
+            'limit': 'Products per page (1-250, default 50)',
+            'cursor': 'Cursor of the next page, from the previous response',
+            'page': 'Page number of the dashboard grid (newest first, offset pages of `limit`); '
+                    'ignores cursor, sort and filters',
+            'sort': 'Sort field: id (default), title, created_at or updated_at',
+            'order': 'Sort order: desc (default) or asc',
+            'fields': 'Comma-separated product fields to return',
+            'status': 'Only products with this status (active, draft, archived)',
+            'vendor': 'Only products from this vendor',
+            'product_type': 'Only products of this type',
+            'title': 'Only products whose title starts with this prefix (case-insensitive)'
+        },
         responses={
-            200: ('Successfully retrieved products', product),
+            200: ('Successfully retrieved products', [product]),
+            400: ('Invalid pagination, sort or filter parameters', error_response),
             401: ('Unauthorized - Invalid or missing API key', error_response),
             500: ('Internal server error', error_response)
         }
     )
-    @products_ns.marshal_list_with(product)
     def get(self):
-        """List all products"""
+        """List products"""
+        args = request.args
+        fields = parse_fields(args.get('fields'))
+        if 'page' in args:
+            return self._grid_page(args, fields)
+        try:
+            products, next_cursor = get_shopify_service().list_products(
+                limit=args.get('limit', 50, type=int),
+                cursor=args.get('cursor'),
+                sort=args.get('sort', 'id'),
+                order=args.get('order', 'desc'),
+                fields=fields,
+                status=args.get('status'),
+                vendor=args.get('vendor'),
+                product_type=args.get('product_type'),
+                title_prefix=args.get('title')
+            )
+        except ValueError as e:
+            api.abort(400, str(e), error_code='INVALID_PRODUCT_QUERY')
+        except Exception as e:
+            api.abort(500, str(e), error_code='PRODUCT_LIST_ERROR')
+
+        headers = {}
+        if next_cursor:
+            next_url = f"{request.base_url}?{urlencode({**args.to_dict(), 'cursor': next_cursor})}"
+            headers['Link'] = f'<{next_url}>; rel="next"'
+            headers['X-Next-Cursor'] = next_cursor
+        # A projection returns just the requested keys; full products keep the documented shape
+        return (products if fields else marshal(products, product)), 200, headers
+
+    def _grid_page(self, args, fields):
+        """One page of the dashboard grid, the same slice the server-rendered dashboard shows"""
+        page = args.get('page', type=int)
+        limit = args.get('limit', DASHBOARD_PAGE_SIZE, type=int)
+        if not page or page < 1 or not limit or not 1 <= limit <= 250:
+            api.abort(400, "page must be >= 1 and limit between 1 and 250", error_code='INVALID_PRODUCT_QUERY')
         try:
-            return get_shopify_service().get_products()
+            products = get_shopify_service().get_product_page(page, limit)
         except Exception as e:
             api.abort(500, str(e), error_code='PRODUCT_LIST_ERROR')
+        if fields:
+            products = [{field: p.get(field) for field in fields} for p in products]
+            return products, 200
+        return marshal(products, product), 200
 
     @products_ns.doc(
         description='Create a new product in your Shopify store',
@@ -267,10 +338,7 @@ class ProductList(Resource):
                 images=images
             )
             
-            # Get the full product data to ensure all fields are present
-            if product and product.get('id'):
-                product = shopify_service.get_product(product['id'])
-            
+            # The 201 body is the complete product, no need to read it back
             current_app.logger.info(f"Product created successfully with ID: {product.get('id')}")
             return product, 201
             
@@ -281,6 +349,74 @@ class ProductList(Resource):
             current_app.logger.error(f"Error creating product: {str(e)}")
             api.abort(500, str(e), error_code='PRODUCT_CREATE_ERROR')
 
+bulk_delete_request = api.model('BulkDeleteRequest', {
+    'product_ids': fields.List(fields.String, required=True, description='Products to delete (up to 1000)')
+})
+
+bulk_delete_job = api.model('BulkDeleteJob', {
+    'id': fields.String(description='Job ID'),
+    'status': fields.String(description='Job status', enum=['queued', 'running', 'completed', 'failed']),
+    'total': fields.Integer(description='Products in the job'),
+    'processed': fields.Integer(description='Products handled so far'),
+    'deleted': fields.Integer(description='Products deleted'),
+    'failed': fields.List(fields.String, description='Products that could not be deleted'),
+    'not_found': fields.List(fields.String, description='Products that did not exist'),
+    'templates_deleted': fields.Integer(description='Product templates removed from the active theme'),
+    'progress': fields.Float(description='Percentage of products handled'),
+    'error': fields.String(description='Error that stopped the job, if any'),
+    'created_at': fields.Float(description='Start time (Unix timestamp)'),
+    'finished_at': fields.Float(description='End time (Unix timestamp)')
+})
+
+@products_ns.route('/bulk-delete')
+class ProductBulkDelete(Resource):
+    @products_ns.doc(
+        description='Delete many products in a background job. Products are deleted concurrently '
+                    'under the store\'s rate limit and their templates are removed from the active theme. '
+                    'Poll the job URL from the Location header for progress.',
+        responses={
+            202: ('Job started', bulk_delete_job),
+            400: ('Missing or too many product ids', error_response),
+            401: ('Unauthorized - Invalid or missing API key', error_response),
+            500: ('Internal server error', error_response)
+        }
+    )
+    @products_ns.expect(bulk_delete_request)
+    def post(self):
+        """Delete products in bulk"""
+        product_ids = (api.payload or {}).get('product_ids')
+        if not isinstance(product_ids, list):
+            api.abort(400, "product_ids must be a list", error_code='INVALID_BULK_DELETE')
+        try:
+            job = get_bulk_delete_jobs().start(get_shopify_service(), product_ids)
+        except ValueError as e:
+            api.abort(400, str(e), error_code='INVALID_BULK_DELETE')
+        except Exception as e:
+            current_app.logger.error(f"Error starting bulk delete: {str(e)}")
+            api.abort(500, str(e), error_code='BULK_DELETE_ERROR')
+
+        location = api.url_for(ProductBulkDeleteJob, job_id=job.id)
+        return marshal(job.to_dict(), bulk_delete_job), 202, {'Location': location}
+
+@products_ns.route('/bulk-delete/<job_id>')
+class ProductBulkDeleteJob(Resource):
+    @products_ns.doc(
+        description='Get the progress of a bulk delete job',
+        responses={
+            200: ('Job progress', bulk_delete_job),
+            404: ('Job not found', error_response)
+        }
+    )
+    @products_ns.marshal_with(bulk_delete_job)
+    def get(self, job_id):
+        """Get bulk delete progress"""
+        service = get_shopify_service()
+        service._init_config()
+        job = get_bulk_delete_jobs().get(job_id, service._store_key())
+        if job is None:
+            api.abort(404, "Bulk delete job not found", error_code='JOB_NOT_FOUND')
+        return job
+
 @products_ns.route('/<id>')
 @products_ns.param('id', 'Product identifier (Shopify GID)')
 class Product(Resource):
@@ -304,11 +440,15 @@ class Product(Resource):
         attribute including variants, images, and metadata.
         """
         try:
-            return get_shopify_service().update_product(id, api.payload)
+            updated = get_shopify_service().update_product(id, api.payload)
         except ValueError as e:
             api.abort(400, str(e), error_code='INVALID_PRODUCT_DATA')
         except Exception as e:
             api.abort(500, str(e), error_code='PRODUCT_UPDATE_ERROR')
+        
+        if not updated:
+            api.abort(500, "Failed to update product", error_code='PRODUCT_UPDATE_ERROR')
+        return updated
 
     @products_ns.doc(
         description='Partially update a product',
@@ -335,11 +475,15 @@ class Product(Resource):
             if 'template_suffix' not in data:
                 api.abort(400, "Only template_suffix updates are supported", error_code='INVALID_UPDATE')
                 
-            return get_shopify_service().update_product(id, {'template_suffix': data['template_suffix']})
+            updated = get_shopify_service().update_product(id, {'template_suffix': data['template_suffix']})
         except ValueError as e:
             api.abort(400, str(e), error_code='INVALID_PRODUCT_DATA')
         except Exception as e:
             api.abort(500, str(e), error_code='PRODUCT_UPDATE_ERROR')
+        
+        if not updated:
+            api.abort(500, "Failed to update product", error_code='PRODUCT_UPDATE_ERROR')
+        return updated
 
     @products_ns.doc(
         description='Delete a product',
@@ -359,42 +503,17 @@ class Product(Resource):
         This action cannot be undone.
         """
         try:
-            shopify_service = get_shopify_service()
-            
-            # Get product data before deletion to access template and images
-            product = shopify_service.get_product(id)
-            if not product:
-                api.abort(404, "Product not found", error_code='PRODUCT_NOT_FOUND')
-            
-            # Store template suffix and image URLs
-            template_suffix = product.get('template_suffix')
-            images = product.get('images', [])
-            
-            # Delete the product first
-            shopify_service.delete_product(id)
-            
-            # Delete the template asset if it exists
-            if template_suffix:
-                try:
-                    asset_key = f'templates/product.{template_suffix}.json'
-                    shopify_service.delete_asset(asset_key)
-                    current_app.logger.info(f"Deleted template asset: {asset_key}")
-                except Exception as e:
-                    current_app.logger.warning(f"Failed to delete template asset: {str(e)}")
-            
-            # Delete all associated images
-            for image in images:
-                try:
-                    if image.get('src'):
-                        shopify_service.delete_image(image['src'])
-                        current_app.logger.info(f"Deleted image: {image['src']}")
-                except Exception as e:
-                    current_app.logger.warning(f"Failed to delete image: {str(e)}")
-            
-            return '', 204
+            # Deletes the template too; images go with the product on Shopify's side
+            deleted = get_shopify_service().delete_product(id)
         except Exception as e:
             current_app.logger.error(f"Error deleting product: {str(e)}")
             api.abort(500, str(e), error_code='PRODUCT_DELETE_ERROR')
+        
+        if deleted is None:
+            api.abort(404, "Product not found", error_code='PRODUCT_NOT_FOUND')
+        if not deleted:
+            api.abort(500, "Failed to delete product", error_code='PRODUCT_DELETE_ERROR')
+        return '', 204
 
     @products_ns.doc(
         description='Duplicate a product',
@@ -788,20 +907,18 @@ class ConnectStore(Resource):
             if not store_url.endswith('.myshopify.com'):
                 store_url += '.myshopify.com'
             
-            # Initialize temporary service to validate credentials
-            temp_service = ShopifyService()
-            temp_service.initialize(store_url, api_key)
-            
-            # Test connection by fetching themes
-            themes = temp_service.get_themes()
-            if not themes:
+            # Validate credentials on a throwaway client, so a rejected token never
+            # replaces the store's pooled client
+            probe = ShopifyService()
+            probe.initialize(store_url, api_key)
+            if not probe.verify_access():
                 api.abort(400, 'Could not fetch store data. Please verify your credentials.')
             
             # Get current user from session
             if not hasattr(current_app, 'supabase'):
                 api.abort(500, 'Database connection not initialized')
             
-            user_id = session.get('user_id')
+            user_id = (session.get('user') or {}).get('id')
             if not user_id:
                 api.abort(401, 'User not authenticated')
             
@@ -813,6 +930,14 @@ class ConnectStore(Resource):
                 'connected_at': datetime.utcnow().isoformat()
             }).eq('id', user_id).execute()
             
+            # Keep the token server-side with the store's client; the session only selects the store
+            registry = get_client_registry()
+            try:
+                registry.connect(store_url, api_key)
+            except Exception:
+                registry.remove(store_url)
+                raise
+            
             # Update session
             session['store_connected'] = True
             session['store_url'] = store_url
@@ -830,7 +955,10 @@ class ConnectStore(Resource):
 class AnalyticsDashboard(Resource):
     @analytics_ns.doc(
         description='Get a summary of all analytics metrics for the dashboard',
-        params={'time_range': 'Time range for analytics (7d, 30d, 90d, 1y)'}
+        params={
+            'time_range': 'Time range for analytics (7d, 30d, 90d, 1y)',
+            'max_points': 'Downsample daily_metrics to at most this many points (minimum 3)'
+        }
     )
     @analytics_ns.response(200, 'Success', dashboard_summary)
     @analytics_ns.response(500, 'Internal server error', error_response)
@@ -838,7 +966,8 @@ class AnalyticsDashboard(Resource):
         """Get dashboard analytics summary"""
         try:
             time_range = request.args.get('time_range', '30d')
-            return get_analytics_service().get_dashboard_summary(time_range)
+            max_points = request.args.get('max_points', type=int)
+            return get_analytics_service().get_dashboard_summary(time_range, max_points=max_points)
         except Exception as e:
             api.abort(500, str(e))
 
@@ -862,7 +991,10 @@ class ProductAnalytics(Resource):
 class OrderAnalytics(Resource):
     @analytics_ns.doc(
         description='Get order-related analytics',
-        params={'time_range': 'Time range for analytics (7d, 30d, 90d, 1y)'}
+        params={
+            'time_range': 'Time range for analytics (7d, 30d, 90d, 1y)',
+            'max_points': 'Downsample daily_metrics to at most this many points (minimum 3)'
+        }
     )
     @analytics_ns.response(200, 'Success', order_analytics)
     @analytics_ns.response(500, 'Internal server error', error_response)
@@ -870,7 +1002,8 @@ class OrderAnalytics(Resource):
         """Get order analytics"""
         try:
             time_range = request.args.get('time_range', '30d')
-            return get_analytics_service().get_order_analytics(time_range)
+            max_points = request.args.get('max_points', type=int)
+            return get_analytics_service().get_order_analytics(time_range, max_points=max_points)
         except Exception as e:
             api.abort(500, str(e))
 
@@ -904,4 +1037,86 @@ class StorePerformance(Resource):
             time_range = request.args.get('time_range', '30d')
             return get_analytics_service().get_store_performance(time_range)
         except Exception as e:
-            api.abort(500, str(e)) 
\ No newline at end of file
+            api.abort(500, str(e))
+
+
+def export_response(name, records, export_format, fields, default_fields):
+    """Build a chunked download response that encodes records as they are produced"""
+    chunks = iter_guarded(
+        iter_export(records, export_format, fields, default_fields),
+        export_format,
+        on_error=lambda e: current_app.logger.error(f"Export of {name} failed mid-stream: {str(e)}")
+    )
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'  # Let proxies pass chunks through as they are written
+        }
+    )
+
+@export_ns.route('/products')
+class ProductExport(Resource):
+    @export_ns.doc(
+        description='Stream the whole catalog as NDJSON or CSV without loading it into memory',
+        params={
+            'format': 'ndjson (default) or csv',
+            'fields': 'Comma-separated fields to export (CSV defaults to the main product columns)',
+            'source': 'mirror (default, local catalog mirror) or shopify (page through the Shopify API)'
+        }
+    )
+    @export_ns.response(400, 'Invalid export parameters', error_response)
+    def get(self):
+        """Export products"""
+        export_format = request.args.get('format', 'ndjson')
+        fields = parse_fields(request.args.get('fields'))
+        source = request.args.get('source', 'mirror')
+        if source not in ('mirror', 'shopify'):
+            api.abort(400, "source must be 'mirror' or 'shopify'", error_code='INVALID_EXPORT_SOURCE')
+
+        shopify_service = get_shopify_service()
+        if source == 'shopify':
+            upstream_fields = fields or (PRODUCT_EXPORT_FIELDS if export_format == 'csv' else None)
+            records = shopify_service.iter_products(fields=upstream_fields)
+        else:
+            records = shopify_service.stream_products()
+
+        try:
+            return export_response('products', records, export_format, fields, PRODUCT_EXPORT_FIELDS)
+        except ValueError as e:
+            api.abort(400, str(e), error_code='INVALID_EXPORT_FORMAT')
+
+@export_ns.route('/orders')
+class OrderExport(Resource):
+    @export_ns.doc(
+        description='Stream order history as NDJSON or CSV, page by page from Shopify. Requires a connected store',
+        params={
+            'format': 'ndjson (default) or csv',
+            'fields': 'Comma-separated fields to export (defaults to the order columns without customer data; '
+                      'email, customer, addresses and other personal fields must be listed explicitly)',
+            'start_date': 'Only orders created on or after this date (YYYY-MM-DD)',
+            'end_date': 'Only orders created on or before this date (YYYY-MM-DD)',
+            'status': 'Order status filter (default: any)'
+        }
+    )
+    @export_ns.response(400, 'Invalid export parameters', error_response)
+    @export_ns.response(401, 'No connected store in the session', error_response)
+    def get(self):
+        """Export orders"""
+        if not session.get('user') or not session.get('store_connected'):
+            api.abort(401, 'Connect a store to export its orders', error_code='STORE_NOT_CONNECTED')
+        export_format = request.args.get('format', 'ndjson')
+        fields = parse_fields(request.args.get('fields')) or ORDER_EXPORT_FIELDS
+        records = get_shopify_service().iter_orders(
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            status=request.args.get('status', 'any'),
+            fields=fields
+        )
+
+        try:
+            return export_response('orders', records, export_format, fields, ORDER_EXPORT_FIELDS)
+        except ValueError as e:
+            api.abort(400, str(e), error_code='INVALID_EXPORT_FORMAT')
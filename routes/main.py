@@ -1,11 +1,11 @@
-from flask import Blueprint, render_template, current_app, flash, jsonify, redirect, url_for, session
+from flask import Blueprint, render_template, current_app, flash, jsonify, redirect, url_for, session, request
 import requests
 import google.generativeai as genai
-from services.shopify_service import ShopifyService
+from services.shopify_service import DASHBOARD_PAGE_SIZE
+from services.client_registry import get_client_registry
 from auth.decorators import login_required
 
 main_bp = Blueprint('main', __name__)
-shopify_service = ShopifyService()
 
 @main_bp.route('/')
 def landing():
@@ -45,32 +45,26 @@ def dashboard():
     }
     error = None
     active_theme_id = None
+    page = max(request.args.get('page', 1, type=int), 1)
+    total_pages = 1
     
     try:
         shopify_service = get_shopify_service()
-        products = shopify_service.get_products()
-        themes = shopify_service.get_themes()
         
-        # Get active theme
-        active_theme = next((theme for theme in themes if theme.get('role') == 'main'), None)
+        # Stats cards come from count endpoints and local aggregates, not the full catalog
+        stats = shopify_service.get_store_stats()
+        active_theme = stats['active_theme']
         active_theme_id = active_theme.get('id') if active_theme else None
         
-        # Calculate average product price from variants
-        total_price = 0.0
-        total_variants = 0
-        for product in products:
-            for variant in product.get('variants', []):
-                if variant.get('price'):
-                    total_price += float(variant.get('price', 0))
-                    total_variants += 1
-        
-        avg_price = total_price / total_variants if total_variants > 0 else 0
+        # Only the grid page being shown is loaded
+        products = shopify_service.get_product_page(page, DASHBOARD_PAGE_SIZE)
+        total_pages = max(-(-stats['total_products'] // DASHBOARD_PAGE_SIZE), 1)
         
         # Update store stats with actual data
         store_stats.update({
-            'total_products': len(products),
-            'total_themes': len(themes),
-            'avg_price': f"{avg_price:,.2f}"
+            'total_products': stats['total_products'],
+            'total_themes': stats['total_themes'],
+            'avg_price': f"{stats['avg_price']:,.2f}"
         })
         
     except Exception as e:
@@ -84,13 +78,14 @@ def dashboard():
                          store_stats=store_stats,
                          error=error,
                          active_theme_id=active_theme_id,
+                         page=page,
+                         page_size=DASHBOARD_PAGE_SIZE,
+                         total_pages=total_pages,
                          ai_insights=None)  # Set to None initially
 
 def get_shopify_service():
-    """Get or create ShopifyService instance"""
-    if not hasattr(current_app, 'shopify_service'):
-        current_app.shopify_service = ShopifyService()
-    return current_app.shopify_service
+    """Get the Shopify client of the store this request works on"""
+    return get_client_registry().current()
 
 @main_bp.route('/ai-insights')
 def get_ai_insights():
@@ -1,23 +1,22 @@
-from flask import Blueprint, render_template, jsonify, request, current_app, flash
+from flask import Blueprint, render_template, jsonify, request, current_app, flash, g
 from datetime import datetime, timedelta
 import random
-from services.shopify_service import ShopifyService
+from services.shopify_service import DASHBOARD_PAGE_SIZE
+from services.client_registry import get_client_registry
 from services.analytics_service import AnalyticsService
 from auth.decorators import login_required
 
 pages = Blueprint('pages', __name__)
 
 def get_shopify_service():
-    """Get or create ShopifyService instance"""
-    if not hasattr(current_app, 'shopify_service'):
-        current_app.shopify_service = ShopifyService()
-    return current_app.shopify_service
+    """Get the Shopify client of the store this request works on"""
+    return get_client_registry().current()
 
 def get_analytics_service():
-    """Get or create AnalyticsService instance"""
-    if not hasattr(current_app, 'analytics_service'):
-        current_app.analytics_service = AnalyticsService()
-    return current_app.analytics_service
+    """Get the AnalyticsService of this request, bound to the request's store"""
+    if 'analytics_service' not in g:
+        g.analytics_service = AnalyticsService(get_shopify_service())
+    return g.analytics_service
 
 @pages.route('/dashboard')
 def dashboard():
@@ -32,37 +31,27 @@ def dashboard():
     }
     error = None
     active_theme_id = None
+    page = max(request.args.get('page', 1, type=int), 1)
+    total_pages = 1
     
     try:
         shopify_service = get_shopify_service()
-        products = shopify_service.get_products()
-        themes = shopify_service.get_themes()
         
-        # Get active theme
-        active_theme = next((theme for theme in themes if theme.get('role') == 'main'), None)
+        # Stats cards come from count endpoints and local aggregates, not the full catalog
+        stats = shopify_service.get_store_stats()
+        active_theme = stats['active_theme']
         active_theme_id = active_theme.get('id') if active_theme else None
         
-        # Calculate average product price and inventory value from variants
-        total_price = 0.0
-        total_inventory_value = 0.0
-        total_variants = 0
-        for product in products:
-            for variant in product.get('variants', []):
-                if variant.get('price'):
-                    price = float(variant.get('price', 0))
-                    inventory = int(variant.get('inventory_quantity', 0))
-                    total_price += price
-                    total_inventory_value += price * inventory
-                    total_variants += 1
-        
-        avg_price = total_price / total_variants if total_variants > 0 else 0
+        # Only the grid page being shown is loaded
+        products = shopify_service.get_product_page(page, DASHBOARD_PAGE_SIZE)
+        total_pages = max(-(-stats['total_products'] // DASHBOARD_PAGE_SIZE), 1)
         
         # Update store stats with actual data
         store_stats.update({
-            'total_products': len(products),
-            'total_themes': len(themes),
-            'inventory_value': f"{total_inventory_value:,.2f}",
-            'avg_price': f"{avg_price:,.2f}"
+            'total_products': stats['total_products'],
+            'total_themes': stats['total_themes'],
+            'inventory_value': f"{stats['inventory_value']:,.2f}",
+            'avg_price': f"{stats['avg_price']:,.2f}"
         })
         
     except Exception as e:
@@ -74,7 +63,10 @@ def dashboard():
                          products=products, 
                          store_stats=store_stats,
                          error=error,
-                         active_theme_id=active_theme_id)
+                         active_theme_id=active_theme_id,
+                         page=page,
+                         page_size=DASHBOARD_PAGE_SIZE,
+                         total_pages=total_pages)
 
 @pages.route('/analytics')
 @login_required
@@ -88,7 +80,10 @@ def analytics():
         analytics_service = get_analytics_service()
         
         # Get analytics data
-        analytics_data = analytics_service.get_dashboard_summary(time_range)
+        analytics_data = analytics_service.get_dashboard_summary(
+            time_range,
+            max_points=current_app.config.get('ANALYTICS_CHART_POINTS')
+        )
         
         return render_template(
             'analytics.html',
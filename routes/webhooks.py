@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify, request, current_app
+import json
+from services.webhook_service import get_webhook_service, verify_hmac
+
+webhooks_bp = Blueprint('webhooks', __name__, url_prefix='/webhooks')
+
+
+@webhooks_bp.route('/shopify', methods=['POST'])
+def shopify_webhook():
+    """Receive a Shopify webhook and apply it to the local mirror and caches"""
+    body = request.get_data()
+    secret = current_app.config.get('SHOPIFY_WEBHOOK_SECRET')
+    if not verify_hmac(secret, body, request.headers.get('X-Shopify-Hmac-Sha256')):
+        current_app.logger.warning(f"Rejected Shopify webhook with an invalid signature from {request.remote_addr}")
+        return jsonify({'error': 'Invalid webhook signature'}), 401
+
+    topic = request.headers.get('X-Shopify-Topic')
+    store = request.headers.get('X-Shopify-Shop-Domain')
+    if not topic or not store:
+        return jsonify({'error': 'Missing X-Shopify-Topic or X-Shopify-Shop-Domain header'}), 400
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return jsonify({'error': 'Webhook body is not valid JSON'}), 400
+
+    try:
+        result = get_webhook_service().handle(topic, store, payload, request.headers.get('X-Shopify-Webhook-Id'))
+    except Exception as e:
+        # A non-2xx answer makes Shopify retry the delivery later
+        current_app.logger.error(f"Error applying {topic} webhook from {store}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({'status': result}), 200
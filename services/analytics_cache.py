@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import redis
+from flask import current_app
+
+# Seconds a cached analytics result stays valid; order and traffic data is not
+# part of the catalog fingerprint, so this bounds how stale those numbers get
+DEFAULT_ANALYTICS_CACHE_TTL = 300
+DEFAULT_ANALYTICS_CACHE_SIZE = 256
+KEY_PREFIX = 'generify:analytics'
+
+
+class AnalyticsCache:
+    """Two-level cache of computed analytics results
+
+    Results are kept in a small per-process LRU and, when REDIS_URL is set, in
+    Redis so every gunicorn worker shares warm results. Keys embed the store's
+    catalog fingerprint, so a catalog change makes old entries unreachable and
+    they simply age out. Cached results are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self, redis_url=None, ttl=DEFAULT_ANALYTICS_CACHE_TTL, maxsize=DEFAULT_ANALYTICS_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = redis.from_url(redis_url) if redis_url else None
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(store, endpoint, time_range, fingerprint):
+        """Build the cache key of one analytics result"""
+        return f"{KEY_PREFIX}:{store}:{endpoint}:{time_range}:{fingerprint}"
+
+    def get(self, key):
+        """Get a cached result, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.local_hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(key)
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Analytics cache read failed: {str(e)}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                ttl = self._redis_ttl(key)
+                self._store_local(key, value, ttl)
+                with self._lock:
+                    self.redis_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Cache a result in both levels"""
+        self._store_local(key, value, self.ttl)
+        if self._redis is not None:
+            try:
+                self._redis.setex(key, self.ttl, json.dumps(value, default=str))
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Analytics cache write failed: {str(e)}")
+
+    def _store_local(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _redis_ttl(self, key):
+        """Remaining Redis TTL of a key, so the local copy doesn't outlive it"""
+        try:
+            ttl = self._redis.ttl(key)
+        except redis.RedisError:
+            return self.ttl
+        return ttl if ttl and ttl > 0 else self.ttl
+
+    def invalidate(self, store):
+        """Drop every cached result of a store
+
+        Returns:
+            int: Number of local entries removed
+        """
+        prefix = f"{KEY_PREFIX}:{store}:"
+        with self._lock:
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                keys = list(self._redis.scan_iter(match=f"{prefix}*", count=500))
+                if keys:
+                    self._redis.delete(*keys)
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Analytics cache invalidation failed: {str(e)}")
+        return len(stale)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'backend': 'redis' if self._redis is not None else 'local',
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'local_hits': self.local_hits,
+                'redis_hits': self.redis_hits,
+                'misses': self.misses
+            }
+
+
+_analytics_cache = None
+_analytics_cache_lock = threading.Lock()
+
+
+def get_analytics_cache(redis_url=None, ttl=None, maxsize=None):
+    """Get the process-wide analytics cache, creating it on first use"""
+    global _analytics_cache
+    if _analytics_cache is None:
+        with _analytics_cache_lock:
+            if _analytics_cache is None:
+                _analytics_cache = AnalyticsCache(
+                    redis_url or os.environ.get('REDIS_URL'),
+                    ttl=ttl or DEFAULT_ANALYTICS_CACHE_TTL,
+                    maxsize=maxsize or DEFAULT_ANALYTICS_CACHE_SIZE
+                )
+    return _analytics_cache
+
+
+def get_analytics_cache_stats():
+    """Stats of the analytics cache, or None if it hasn't been used in this process"""
+    return _analytics_cache.get_stats() if _analytics_cache is not None else None
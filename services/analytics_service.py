@@ -1,11 +1,45 @@
-from flask import current_app
+from flask import current_app, has_request_context
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import json
+import threading
+import time
+from services.analytics_snapshot import AnalyticsSnapshot, get_snapshot
+from services.rollup_store import OrderRollupStore, get_rollup_store
+from services.analytics_cache import AnalyticsCache, get_analytics_cache
+from services.period_comparison import PeriodComparison
+from services.prewarm import get_prewarmer
+from services.downsample import downsample_rows
+from services.single_flight import SHARE_LOCK
+from services.shopify_http import request_deadline
+
+# Daily order rollups: pull updated orders at most this often, and backfill this
+# many days (two years, so 1y views can be compared to the year before) on first use
+ROLLUP_REFRESH_INTERVAL = 60
+ROLLUP_HISTORY_DAYS = 730
+ROLLUP_ORDER_FIELDS = 'id,created_at,updated_at,total_price,line_items'
+
+# Per-store lock held while a store's rollups refresh: {store: Lock}
+_rollup_locks = {}
+_rollup_locks_lock = threading.Lock()
+
+
+def _rollup_lock(store):
+    with _rollup_locks_lock:
+        return _rollup_locks.setdefault(store, threading.Lock())
+
+# Seconds each dashboard section may take before it is reported as timed out
+SECTION_DEADLINES = {
+    'products': 10,
+    'orders': 15,
+    'themes': 5,
+    'performance': 10
+}
 
 class AnalyticsService:
-    def __init__(self):
-        self.shopify_service = None
+    def __init__(self, shopify_service=None):
+        self.shopify_service = shopify_service
 
     def _init_shopify(self):
         """Initialize Shopify service if not already initialized"""
@@ -13,161 +47,321 @@ class AnalyticsService:
             from services.shopify_service import ShopifyService
             self.shopify_service = ShopifyService()
 
-    def get_product_analytics(self, time_range: str = '30d') -> Dict[str, Any]:
+    def get_snapshot(self, time_range: str = '30d') -> AnalyticsSnapshot:
+        """Get the Shopify data snapshot shared by every analysis in the current request"""
+        self._init_shopify()
+        return get_snapshot(self.shopify_service, time_range)
+
+    def _cache(self) -> Optional[AnalyticsCache]:
+        """Get the analytics result cache, or None when it is disabled"""
+        if not current_app.config.get('ANALYTICS_CACHE_ENABLED', True):
+            return None
+        return get_analytics_cache(
+            current_app.config.get('REDIS_URL'),
+            ttl=current_app.config.get('ANALYTICS_CACHE_TTL'),
+            maxsize=current_app.config.get('ANALYTICS_CACHE_SIZE')
+        )
+
+    def _cached(self, endpoint: str, time_range: str, compute, cacheable=None, refresh: bool = False) -> Dict[str, Any]:
+        """Serve an analytics result from the result cache, computing and caching it on a miss
+        
+        Args:
+            endpoint (str): Name of the analytics result
+            time_range (str): Time range for analytics (7d, 30d, 90d, 1y)
+            compute (callable): Builds the result on a miss
+            cacheable (callable): Optional check whether a fresh result may be cached
+            refresh (bool): Recompute and overwrite the cached result
+        """
+        self._init_shopify()
+        if has_request_context() and current_app.config.get('PREWARM_ENABLED', True):
+            # Keep this store warm in the background while its users are around
+            self.shopify_service._init_config()
+            get_prewarmer().touch(self.shopify_service)
+        
+        cache = self._cache()
+        if cache is None:
+            return compute()
+        
+        try:
+            fingerprint = self.shopify_service.get_catalog_fingerprint()
+        except Exception as e:
+            current_app.logger.warning(f"Could not fingerprint catalog, skipping analytics cache: {str(e)}")
+            fingerprint = None
+        if fingerprint is None:
+            return compute()
+        
+        key = cache.make_key(self.shopify_service._store_key(), endpoint, time_range, fingerprint)
+        result = None if refresh else cache.get(key)
+        if result is None:
+            result = compute()
+            if cacheable is None or cacheable(result):
+                cache.set(key, result)
+        return result
+
+    def get_product_analytics(self, time_range: str = '30d', snapshot: Optional[AnalyticsSnapshot] = None) -> Dict[str, Any]:
         """Get product-related analytics
         
         Args:
             time_range (str): Time range for analytics (7d, 30d, 90d, 1y)
+            snapshot (AnalyticsSnapshot): Shared request data; without one the result is served from the result cache
             
         Returns:
             Dict containing product analytics data
         """
-        self._init_shopify()
+        if snapshot is None:
+            return self._cached('products', time_range, lambda: self.get_product_analytics(time_range, self.get_snapshot(time_range)))
         
         try:
-            products = self.shopify_service.get_products()
-            
-            # Calculate product metrics
-            total_products = len(products)
-            active_products = len([p for p in products if p.get('status') == 'active'])
-            total_variants = sum(len(p.get('variants', [])) for p in products)
-            
-            # Analyze product types and vendors
-            product_types = {}
-            vendors = {}
-            price_ranges = {
-                '0-10': 0,
-                '10-25': 0,
-                '25-50': 0,
-                '50-100': 0,
-                '100+': 0
-            }
-            
-            for product in products:
-                # Track product types
-                product_type = product.get('product_type', 'Uncategorized')
-                product_types[product_type] = product_types.get(product_type, 0) + 1
-                
-                # Track vendors
-                vendor = product.get('vendor', 'Unknown')
-                vendors[vendor] = vendors.get(vendor, 0) + 1
-                
-                # Analyze price ranges
-                for variant in product.get('variants', []):
-                    price = float(variant.get('price', 0))
-                    if price <= 10:
-                        price_ranges['0-10'] += 1
-                    elif price <= 25:
-                        price_ranges['10-25'] += 1
-                    elif price <= 50:
-                        price_ranges['25-50'] += 1
-                    elif price <= 100:
-                        price_ranges['50-100'] += 1
-                    else:
-                        price_ranges['100+'] += 1
+            frame = snapshot.frame
             
             return {
                 'summary': {
-                    'total_products': total_products,
-                    'active_products': active_products,
-                    'total_variants': total_variants,
+                    'total_products': frame.total_products,
+                    'active_products': frame.active_products,
+                    'total_variants': frame.total_variants,
                 },
-                'product_types': [
-                    {'type': k, 'count': v} 
-                    for k, v in sorted(product_types.items(), key=lambda x: x[1], reverse=True)
-                ],
-                'vendors': [
-                    {'name': k, 'count': v} 
-                    for k, v in sorted(vendors.items(), key=lambda x: x[1], reverse=True)
-                ],
-                'price_distribution': [
-                    {'range': k, 'count': v} 
-                    for k, v in price_ranges.items()
-                ]
+                'product_types': frame.product_type_counts(),
+                'vendors': frame.vendor_counts(),
+                'price_distribution': frame.price_distribution()
             }
             
         except Exception as e:
             current_app.logger.error(f"Error getting product analytics: {str(e)}")
             raise
 
-    def get_order_analytics(self, time_range: str = '30d') -> Dict[str, Any]:
+    def get_order_analytics(self, time_range: str = '30d', snapshot: Optional[AnalyticsSnapshot] = None,
+                            max_points: Optional[int] = None) -> Dict[str, Any]:
         """Get order-related analytics
         
+        Answered from the materialized daily rollups when they are enabled, so a
+        1y view sums a few hundred precomputed rows instead of refetching orders.
+        The previous period is read in the same pass to compute the trends.
+        
         Args:
             time_range (str): Time range for analytics (7d, 30d, 90d, 1y)
+            snapshot (AnalyticsSnapshot): Shared request data; without one the result is served from the result cache
+            max_points (int): Downsample daily_metrics to at most this many points (LTTB on revenue)
             
         Returns:
             Dict containing order analytics data
         """
-        self._init_shopify()
+        if snapshot is None:
+            analytics = self._cached('orders', time_range, lambda: self.get_order_analytics(time_range, self.get_snapshot(time_range)))
+            return self._downsample_orders(analytics, max_points)
         
         try:
-            # Calculate date range
-            end_date = datetime.now()
-            if time_range == '7d':
-                start_date = end_date - timedelta(days=7)
-            elif time_range == '30d':
-                start_date = end_date - timedelta(days=30)
-            elif time_range == '90d':
-                start_date = end_date - timedelta(days=90)
-            elif time_range == '1y':
-                start_date = end_date - timedelta(days=365)
-            else:
-                start_date = end_date - timedelta(days=30)
-
-            orders = self.shopify_service.get_orders(
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d')
-            )
+            # One read of twice the range covers both the current and the previous period
+            comparison = PeriodComparison(snapshot.start_date, snapshot.end_date)
+            window = self.get_daily_order_rollups(comparison.previous_start, comparison.end_date)
+            if window is None:
+                window = self._fold_daily_orders(comparison.previous_start, comparison.end_date)
+            daily, _ = comparison.split(window)
             
             # Calculate order metrics
-            total_orders = len(orders)
-            total_revenue = sum(float(order.get('total_price', 0)) for order in orders)
+            totals = comparison.totals(window, ['orders', 'revenue', 'units'])
+            total_orders = totals['current']['orders']
+            total_revenue = totals['current']['revenue']
             avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+            previous_orders = totals['previous']['orders']
+            previous_revenue = totals['previous']['revenue']
+            previous_avg_order_value = previous_revenue / previous_orders if previous_orders > 0 else 0
             
-            # Analyze orders by day
-            daily_orders = {}
-            daily_revenue = {}
-            
-            for order in orders:
-                date = order.get('created_at', '').split('T')[0]
-                if date:
-                    daily_orders[date] = daily_orders.get(date, 0) + 1
-                    daily_revenue[date] = daily_revenue.get(date, 0) + float(order.get('total_price', 0))
-            
-            return {
+            analytics = {
                 'summary': {
                     'total_orders': total_orders,
                     'total_revenue': round(total_revenue, 2),
-                    'average_order_value': round(avg_order_value, 2)
+                    'average_order_value': round(avg_order_value, 2),
+                    'orders_trend': round(comparison.trend(total_orders, previous_orders), 2),
+                    'revenue_trend': round(comparison.trend(total_revenue, previous_revenue), 2),
+                    'units_trend': round(comparison.trend(totals['current']['units'], totals['previous']['units']), 2),
+                    'average_order_value_trend': round(comparison.trend(avg_order_value, previous_avg_order_value), 2)
+                },
+                'previous_period': {
+                    'total_orders': previous_orders,
+                    'total_revenue': round(previous_revenue, 2),
+                    'average_order_value': round(previous_avg_order_value, 2)
                 },
                 'daily_metrics': [
                     {
-                        'date': date,
-                        'orders': daily_orders.get(date, 0),
-                        'revenue': round(daily_revenue.get(date, 0), 2)
+                        'date': day['day'],
+                        'orders': day['orders'],
+                        'revenue': round(day['revenue'], 2),
+                        'units': day['units']
                     }
-                    for date in sorted(set(daily_orders.keys()))
+                    for day in daily
                 ]
             }
             
+            return self._downsample_orders(analytics, max_points)
+            
         except Exception as e:
             current_app.logger.error(f"Error getting order analytics: {str(e)}")
             raise
 
-    def get_theme_analytics(self, time_range: str = '30d') -> Dict[str, Any]:
+    @staticmethod
+    def _downsample_orders(analytics: Dict[str, Any], max_points: Optional[int]) -> Dict[str, Any]:
+        """Copy of an order analytics or dashboard result with daily_metrics reduced to max_points (cached results stay intact)"""
+        if not max_points or 'daily_metrics' not in analytics:
+            return analytics
+        return {**analytics, 'daily_metrics': downsample_rows(analytics['daily_metrics'], max_points, 'revenue')}
+
+    def _fold_daily_orders(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Build daily order rows straight from Shopify, one page of orders at a time"""
+        self._init_shopify()
+        daily = {}
+        
+        for page in self.shopify_service.iter_order_pages(
+            start_date=start_date.strftime('%Y-%m-%d'),
+            end_date=end_date.strftime('%Y-%m-%d'),
+            fields='id,created_at,total_price,line_items'
+        ):
+            for order in page:
+                date = order.get('created_at', '').split('T')[0]
+                if not date:
+                    continue
+                row = daily.setdefault(date, {'day': date, 'orders': 0, 'revenue': 0.0, 'units': 0})
+                row['orders'] += 1
+                row['revenue'] += float(order.get('total_price', 0))
+                row['units'] += sum(int(item.get('quantity', 0)) for item in order.get('line_items', []))
+        
+        return [daily[date] for date in sorted(daily)]
+
+    def _rollups(self) -> Optional[OrderRollupStore]:
+        """Get the local order rollup store, or None when rollups are disabled"""
+        if not current_app.config.get('ORDER_ROLLUPS_ENABLED', True):
+            return None
+        return get_rollup_store(current_app.config.get('CATALOG_DB_PATH'))
+
+    def refresh_order_rollups(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Fold orders created or updated since the last watermark into the daily rollups
+        
+        The first refresh backfills ROLLUP_HISTORY_DAYS of orders; later ones only
+        fetch orders with updated_at past the stored watermark. One refresh per
+        store runs at a time; a call made while another is running returns None.
+        
+        Args:
+            force (bool): Refresh even if the last refresh is recent
+            
+        Returns:
+            Dict with the number of orders folded in, or None if nothing was done
+        """
+        rollups = self._rollups()
+        if rollups is None:
+            return None
+        
+        self._init_shopify()
+        self.shopify_service._init_config()
+        store = self.shopify_service._store_key()
+        if not self._rollups_due(rollups.get_state(store), force):
+            return None
+        
+        lock = _rollup_lock(store)
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            return self._refresh_rollups_locked(rollups, store, force)
+        finally:
+            lock.release()
+
+    def _rollups_due(self, state: Optional[Dict[str, Any]], force: bool = False) -> bool:
+        interval = current_app.config.get('ROLLUP_REFRESH_INTERVAL', ROLLUP_REFRESH_INTERVAL)
+        return force or not state or time.time() - (state['last_refresh'] or 0) >= interval
+
+    def _refresh_rollups_locked(self, rollups: OrderRollupStore, store: str, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Refresh with the store's lock held; other workers wait on a SHARE_LOCK single flight"""
+        def refresh():
+            # Another worker may have refreshed while this one waited
+            state = rollups.get_state(store)
+            if not self._rollups_due(state, force):
+                return None
+            return self._fold_into_rollups(rollups, store, state)
+        
+        return self.shopify_service._coalesced('order-rollups', refresh, share=SHARE_LOCK)
+
+    def _fold_into_rollups(self, rollups: OrderRollupStore, store: str, state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fetch orders past the watermark (or the whole history) and fold them into the rollups"""
+        if state and state['watermark']:
+            pages = self.shopify_service.iter_order_pages(updated_at_min=state['watermark'], fields=ROLLUP_ORDER_FIELDS)
+        else:
+            backfill_start = datetime.now() - timedelta(days=ROLLUP_HISTORY_DAYS)
+            pages = self.shopify_service.iter_order_pages(start_date=backfill_start.strftime('%Y-%m-%d'), fields=ROLLUP_ORDER_FIELDS)
+        
+        watermark = None
+        folded = 0
+        for page in pages:
+            page_watermark = rollups.apply_orders(store, page)
+            watermark = max(filter(None, [watermark, page_watermark]), default=None)
+            folded += len(page)
+        
+        rollups.set_state(store, watermark)
+        return {'orders': folded, 'watermark': watermark}
+
+    def _start_rollup_backfill(self, store: str) -> None:
+        """Backfill a store's rollups on a background thread unless a refresh is already running"""
+        lock = _rollup_lock(store)
+        if not lock.acquire(blocking=False):
+            return
+        app = current_app._get_current_object()
+        
+        def backfill():
+            with app.app_context():
+                try:
+                    self._refresh_rollups_locked(self._rollups(), store)
+                except Exception as e:
+                    app.logger.warning(f"Order rollup backfill failed for {store}: {str(e)}")
+                finally:
+                    lock.release()
+        
+        try:
+            threading.Thread(target=backfill, name=f"rollup-backfill-{store}", daemon=True).start()
+        except Exception:
+            lock.release()
+            raise
+
+    def get_daily_order_rollups(self, start_date: datetime, end_date: datetime) -> Optional[List[Dict[str, Any]]]:
+        """Get precomputed daily order rows for a date range, refreshing them first if due
+        
+        The first fill backfills two years of orders, so it runs in the background
+        and callers fold the orders of their range live until it has finished.
+        
+        Returns:
+            List of {day, orders, revenue, units} rows, or None if rollups are
+            disabled or not filled yet
+        """
+        rollups = self._rollups()
+        if rollups is None:
+            return None
+        
+        self._init_shopify()
+        self.shopify_service._init_config()
+        store = self.shopify_service._store_key()
+        if not rollups.get_state(store):
+            self._start_rollup_backfill(store)
+            return None
+        
+        try:
+            self.refresh_order_rollups()
+        except Exception as e:
+            # Stale rollups are still useful
+            current_app.logger.warning(f"Order rollup refresh failed, serving stored rollups: {str(e)}")
+        
+        return rollups.get_daily(store, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+
+    def get_theme_analytics(self, time_range: str = '30d', snapshot: Optional[AnalyticsSnapshot] = None) -> Dict[str, Any]:
         """Get theme-related analytics
         
         Args:
             time_range (str): Time range for analytics (7d, 30d, 90d, 1y)
+            snapshot (AnalyticsSnapshot): Shared request data; without one the result is served from the result cache
             
         Returns:
             Dict containing theme analytics data
         """
-        self._init_shopify()
+        if snapshot is None:
+            return self._cached('themes', time_range, lambda: self.get_theme_analytics(time_range, self.get_snapshot(time_range)))
         
         try:
-            themes = self.shopify_service.get_themes()
+            themes = snapshot.themes
             
             # Analyze themes
             total_themes = len(themes)
@@ -201,58 +395,128 @@ class AnalyticsService:
             current_app.logger.error(f"Error getting theme analytics: {str(e)}")
             raise
 
-    def get_store_performance(self, time_range: str = '30d') -> Dict[str, Any]:
+    def get_store_performance(self, time_range: str = '30d', snapshot: Optional[AnalyticsSnapshot] = None) -> Dict[str, Any]:
         """Get store performance analytics
         
         Args:
             time_range (str): Time range for analytics (7d, 30d, 90d, 1y)
+            snapshot (AnalyticsSnapshot): Shared request data; without one the result is served from the result cache
             
         Returns:
             Dict containing store performance data
         """
-        self._init_shopify()
+        if snapshot is None:
+            return self._cached('performance', time_range, lambda: self.get_store_performance(time_range, self.get_snapshot(time_range)))
         
         try:
-            analytics_data = self.shopify_service.get_analytics_data(time_range)
+            # Traffic only needs the reports, not the full catalog analysis
+            reports = snapshot.reports
             
             return {
                 'traffic': {
-                    'total_views': analytics_data.get('analytics', {}).get('total_views', 0),
-                    'unique_visitors': analytics_data.get('analytics', {}).get('unique_visitors', 0),
-                    'avg_session_duration': analytics_data.get('analytics', {}).get('avg_session_duration', 0),
-                    'bounce_rate': analytics_data.get('analytics', {}).get('bounce_rate', 0)
+                    'total_views': reports.get('total_views', 0),
+                    'unique_visitors': reports.get('unique_visitors', 0),
+                    'avg_session_duration': reports.get('avg_session_duration', 0),
+                    'bounce_rate': reports.get('bounce_rate', 0)
                 },
-                'top_referrers': analytics_data.get('analytics', {}).get('top_referrers', []),
-                'device_breakdown': analytics_data.get('analytics', {}).get('device_breakdown', {})
+                'top_referrers': reports.get('top_referrers', [])[:5],  # Top 5 referrers
+                'device_breakdown': reports.get('device_breakdown', {})
             }
             
         except Exception as e:
             current_app.logger.error(f"Error getting store performance: {str(e)}")
             raise
 
-    def get_dashboard_summary(self, time_range: str = '30d') -> Dict[str, Any]:
+    def get_dashboard_summary(self, time_range: str = '30d', max_points: Optional[int] = None) -> Dict[str, Any]:
         """Get a summary of all analytics for the dashboard
         
+        Products, orders, themes and performance are independent, so they run
+        concurrently and the summary takes as long as the slowest one. A section
+        that fails or misses its deadline is returned empty and flagged in
+        'sections' instead of failing the whole summary; such partial summaries
+        are not cached.
+        
         Args:
             time_range (str): Time range for analytics (7d, 30d, 90d, 1y)
+            max_points (int): Downsample the daily_metrics chart series to at most this many points
             
         Returns:
             Dict containing dashboard summary data
         """
-        try:
-            product_analytics = self.get_product_analytics(time_range)
-            order_analytics = self.get_order_analytics(time_range)
-            theme_analytics = self.get_theme_analytics(time_range)
-            store_performance = self.get_store_performance(time_range)
-            
-            return {
-                'products': product_analytics['summary'],
-                'orders': order_analytics['summary'],
-                'themes': theme_analytics['summary'],
-                'performance': store_performance['traffic'],
-                'time_range': time_range
-            }
-            
-        except Exception as e:
-            current_app.logger.error(f"Error getting dashboard summary: {str(e)}")
-            raise 
\ No newline at end of file
+        summary = self._cached(
+            'dashboard',
+            time_range,
+            lambda: self._build_dashboard_summary(time_range),
+            cacheable=lambda summary: all(section['status'] == 'ok' for section in summary['sections'].values())
+        )
+        return self._downsample_orders(summary, max_points)
+
+    def prewarm(self, time_range: str = '30d') -> None:
+        """Recompute and cache every analytics result of a time range from one snapshot"""
+        snapshot = self.get_snapshot(time_range)
+        sections = {
+            'products': self.get_product_analytics,
+            'orders': self.get_order_analytics,
+            'themes': self.get_theme_analytics,
+            'performance': self.get_store_performance
+        }
+        for endpoint, method in sections.items():
+            self._cached(endpoint, time_range, lambda method=method: method(time_range, snapshot), refresh=True)
+        self._cached(
+            'dashboard',
+            time_range,
+            lambda: self._build_dashboard_summary(time_range),
+            cacheable=lambda summary: all(section['status'] == 'ok' for section in summary['sections'].values()),
+            refresh=True
+        )
+
+    def _build_dashboard_summary(self, time_range: str) -> Dict[str, Any]:
+        """Compute the dashboard summary, running its sections concurrently"""
+        snapshot = self.get_snapshot(time_range)
+        app = current_app._get_current_object()
+        deadlines = {**SECTION_DEADLINES, **current_app.config.get('ANALYTICS_SECTION_DEADLINES', {})}
+        
+        sections = {
+            'products': (self.get_product_analytics, 'summary'),
+            'orders': (self.get_order_analytics, 'summary'),
+            'themes': (self.get_theme_analytics, 'summary'),
+            'performance': (self.get_store_performance, 'traffic')
+        }
+        
+        def run_section(name, method):
+            # The section's Shopify calls share its deadline, so it stops on its own
+            with app.app_context(), request_deadline(deadlines[name]):
+                return method(time_range, snapshot)
+        
+        # A pool per summary starts every section at once, so deadlines run from
+        # the section's start and a section stuck past its deadline can't hold
+        # up the sections of later summaries
+        pool = ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix='analytics')
+        started = time.monotonic()
+        futures = {
+            name: pool.submit(run_section, name, method)
+            for name, (method, _) in sections.items()
+        }
+        pool.shutdown(wait=False)
+        
+        summary = {'time_range': time_range, 'sections': {}, 'daily_metrics': []}
+        for name, future in futures.items():
+            remaining = max(deadlines[name] - (time.monotonic() - started), 0)
+            try:
+                result = future.result(timeout=remaining)
+                summary[name] = result[sections[name][1]]
+                summary['sections'][name] = {'status': 'ok'}
+                if name == 'orders':
+                    # Daily series behind the analytics page charts
+                    summary['daily_metrics'] = result['daily_metrics']
+            except FuturesTimeoutError:
+                current_app.logger.warning(f"Dashboard section '{name}' missed its {deadlines[name]}s deadline")
+                summary[name] = {}
+                summary['sections'][name] = {'status': 'timeout'}
+            except Exception as e:
+                current_app.logger.error(f"Error getting dashboard section '{name}': {str(e)}")
+                summary[name] = {}
+                summary['sections'][name] = {'status': 'error', 'error': str(e)}
+        
+        summary['elapsed'] = round(time.monotonic() - started, 3)
+        return summary
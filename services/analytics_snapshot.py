@@ -0,0 +1,82 @@
+import threading
+from services.catalog_frame import CatalogFrame
+from datetime import datetime, timedelta
+from flask import g, has_app_context
+
+TIME_RANGE_DAYS = {
+    '7d': 7,
+    '30d': 30,
+    '90d': 90,
+    '1y': 365
+}
+
+
+def resolve_time_range(time_range, end_date=None):
+    """Turn a time range code (7d, 30d, 90d, 1y) into a (start_date, end_date) pair
+
+    Unknown codes fall back to 30 days.
+    """
+    end_date = end_date or datetime.now()
+    return end_date - timedelta(days=TIME_RANGE_DAYS.get(time_range, 30)), end_date
+
+
+class AnalyticsSnapshot:
+    """Shopify data for one analytics request, fetched lazily and at most once
+
+    Every sub-analysis of a request reads products, themes and reports through
+    the same snapshot, so a dashboard load issues one call per resource no
+    matter how many sections use it. Loads are guarded per resource, so
+    sections running on different threads still share a single fetch.
+    """
+
+    def __init__(self, shopify_service, time_range='30d'):
+        self.shopify_service = shopify_service
+        self.time_range = time_range
+        self.start_date, self.end_date = resolve_time_range(time_range)
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in ('products', 'frame', 'themes', 'reports')}
+
+    def _load(self, name, loader):
+        if name not in self._values:
+            with self._locks[name]:
+                if name not in self._values:
+                    self._values[name] = loader()
+        return self._values[name]
+
+    @property
+    def products(self):
+        return self._load('products', self.shopify_service.get_products)
+
+    @property
+    def frame(self):
+        """Columnar view of the snapshot's products, built once"""
+        return self._load('frame', lambda: CatalogFrame(self.products))
+
+    @property
+    def themes(self):
+        return self._load('themes', self.shopify_service.get_themes)
+
+    @property
+    def reports(self):
+        return self._load(
+            'reports',
+            lambda: self.shopify_service._get_analytics_reports(self.start_date, self.end_date)
+        )
+
+    @property
+    def active_theme(self):
+        return next((theme for theme in self.themes if theme.get('role') == 'main'), None)
+
+
+def get_snapshot(shopify_service, time_range='30d'):
+    """Get the snapshot for a time range, shared across the current request
+
+    Outside an application context every call gets a fresh snapshot.
+    """
+    if not has_app_context():
+        return AnalyticsSnapshot(shopify_service, time_range)
+
+    snapshots = g.setdefault('analytics_snapshots', {})
+    if time_range not in snapshots:
+        snapshots[time_range] = AnalyticsSnapshot(shopify_service, time_range)
+    return snapshots[time_range]
@@ -0,0 +1,289 @@
+import asyncio
+import time
+import httpx
+from flask import current_app
+from urllib.parse import urlparse
+from services.shopify_service import ShopifyService, MAX_RATE_LIMIT_RETRIES
+from services.shopify_http import DEFAULT_TIMEOUT
+from services.rate_limiter import get_rate_limiter
+
+# Requests in flight at once per service; the rate limiter still paces them
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class AsyncShopifyService:
+    """asyncio counterpart of ShopifyService for fanning out independent calls
+
+    Shares the per-store leaky-bucket limiter with the blocking service, so both
+    can be used side by side without overrunning the store's API budget.
+
+    Sync code runs a batch of calls with run_batch():
+
+        products, themes = AsyncShopifyService().run_batch(
+            lambda s: s.get_products(),
+            lambda s: s.get_themes()
+        )
+    """
+
+    def __init__(self, store_url=None, access_token=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self._helpers = ShopifyService()
+        if store_url and access_token:
+            self._helpers.initialize(store_url, access_token)
+        self.max_concurrency = max_concurrency
+        self._client = None
+        self._semaphore = None
+
+    @classmethod
+    def from_service(cls, service, **kwargs):
+        """Build an async service bound to the same store as a ShopifyService"""
+        service._init_config()
+        store_url = urlparse(service.base_url).netloc
+        return cls(store_url, service.access_token, **kwargs)
+
+    @property
+    def base_url(self):
+        self._helpers._init_config()
+        return self._helpers.base_url
+
+    async def __aenter__(self):
+        self._helpers._init_config()
+        connect_timeout, read_timeout = DEFAULT_TIMEOUT
+        self._client = httpx.AsyncClient(
+            headers=self._helpers.headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+
+    async def _request(self, method, url, **kwargs):
+        """Send a rate-limited request, retrying 429s with backoff
+
+        Returns:
+            httpx.Response: The raw response
+        """
+        if self._client is None:
+            raise RuntimeError("AsyncShopifyService must be used inside 'async with' or run_batch()")
+
+        limiter = get_rate_limiter(urlparse(url).netloc)
+        async with self._semaphore:
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                wait = limiter.reserve()
+                if wait:
+                    await asyncio.sleep(wait)
+                response = await self._client.request(method, url, **kwargs)
+                limiter.update(response)
+                if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                    return response
+                current_app.logger.warning(f"Shopify rate limit hit on {method} {url}, retrying (attempt {attempt + 1})")
+                await asyncio.sleep(limiter.backoff_delay(attempt, response.headers.get('Retry-After')))
+
+    async def _get_pages(self, url, key, params=None):
+        """Follow the Link rel="next" cursor and collect every record"""
+        records = []
+        fields = (params or {}).get('fields')
+        while url:
+            response = await self._request('GET', url, params=params)
+            response.raise_for_status()
+            records.extend(response.json().get(key, []))
+            url = response.links.get('next', {}).get('url')
+            params = {'fields': fields} if fields and url and 'fields=' not in url else None
+        return records
+
+    async def get_product(self, product_id):
+        """Get a single product by ID, or None if it doesn't exist"""
+        response = await self._request('GET', f"{self.base_url}/products/{product_id}.json")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json().get('product', {})
+
+    async def get_products(self, page_size=250, fields=None, **filters):
+        """Fetch every product, normalized like ShopifyService.get_products"""
+        params = {'limit': min(int(page_size), 250), **filters}
+        if fields:
+            params['fields'] = ','.join(fields) if isinstance(fields, (list, tuple)) else fields
+        products = await self._get_pages(f"{self.base_url}/products.json", 'products', params)
+        return [self._helpers._normalize_product(product) for product in products]
+
+    async def get_orders(self, start_date=None, end_date=None, status='any', fields=None):
+        """Fetch orders with optional date filtering"""
+        params = {'status': status, 'limit': 250}
+        if start_date:
+            params['created_at_min'] = f"{start_date}T00:00:00Z"
+        if end_date:
+            params['created_at_max'] = f"{end_date}T23:59:59Z"
+        if fields:
+            params['fields'] = ','.join(fields) if isinstance(fields, (list, tuple)) else fields
+        return await self._get_pages(f"{self.base_url}/orders.json", 'orders', params)
+
+    async def get_themes(self):
+        """Fetch all themes from Shopify store"""
+        response = await self._request('GET', f"{self.base_url}/themes.json")
+        response.raise_for_status()
+        themes = response.json().get('themes', [])
+        self._helpers._cache_active_theme(next((theme for theme in themes if theme.get('role') == 'main'), None))
+        return themes
+
+    async def get_active_theme(self):
+        """Get the store's main theme from the shared per-store cache, fetching themes on a miss"""
+        cached = self._helpers._active_themes.get(self._helpers._store_key())
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        themes = await self.get_themes()
+        return next((theme for theme in themes if theme.get('role') == 'main'), None)
+
+    async def get_products_by_ids(self, product_ids, fields=None):
+        """Fetch many products by id, 250 per request, pages fetched concurrently
+
+        Returns:
+            list: Products that exist; missing ids are simply absent
+        """
+        ids = [str(product_id) for product_id in product_ids]
+        params = {}
+        if fields:
+            params['fields'] = ','.join(fields) if isinstance(fields, (list, tuple)) else fields
+        pages = await asyncio.gather(*(
+            self._get_pages(
+                f"{self.base_url}/products.json",
+                'products',
+                {**params, 'ids': ','.join(ids[i:i + 250]), 'limit': 250}
+            )
+            for i in range(0, len(ids), 250)
+        ))
+        return [product for page in pages for product in page]
+
+    async def delete_image(self, product_id, image_id):
+        """Delete a single product image
+
+        Returns:
+            bool: True if the image was deleted
+        """
+        response = await self._request('DELETE', f"{self.base_url}/products/{product_id}/images/{image_id}.json")
+        if response.status_code == 200:
+            current_app.logger.info(f"Successfully deleted image {image_id}")
+            return True
+        current_app.logger.warning(f"Failed to delete image {image_id}: {response.text}")
+        return False
+
+    async def delete_asset(self, theme_id, asset_key):
+        """Delete one theme asset
+
+        Returns:
+            bool: True if the asset was deleted
+        """
+        response = await self._request(
+            'DELETE',
+            f"{self.base_url}/themes/{theme_id}/assets.json",
+            params={'asset[key]': asset_key}
+        )
+        if response.status_code == 200:
+            return True
+        current_app.logger.warning(f"Failed to delete template {asset_key}: {response.text}")
+        return False
+
+    async def _delete_product_only(self, product_id):
+        """Delete a product; its images and variants go with it"""
+        response = await self._request('DELETE', f"{self.base_url}/products/{product_id}.json")
+        if response.status_code == 200:
+            return True
+        current_app.logger.error(f"Failed to delete product {product_id}: {response.text}")
+        return False
+
+    async def delete_product(self, product_id):
+        """Delete a product and its template
+
+        Images are not deleted one by one; Shopify removes them with the product.
+
+        Returns:
+            bool: True if the product was deleted
+        """
+        results = await self.delete_products([product_id])
+        return bool(results['deleted'])
+
+    async def delete_products(self, product_ids, on_progress=None):
+        """Delete many products concurrently, then their templates
+
+        Template suffixes are read with batched products.json?ids= requests,
+        the product deletes run concurrently (bounded by max_concurrency and
+        paced by the store's rate bucket), and the templates of the deleted
+        products are removed from the active theme, resolved once, with each
+        distinct asset key deleted once.
+
+        Args:
+            product_ids (list): Products to delete
+            on_progress (callable): Called as on_progress(product_id, outcome) with
+                outcome 'deleted', 'failed' or 'not_found' as each product finishes
+
+        Returns:
+            dict: Ids per outcome and the number of templates deleted
+        """
+        product_ids = list(dict.fromkeys(str(product_id) for product_id in product_ids))
+        products = await self.get_products_by_ids(product_ids, fields=('id', 'template_suffix'))
+        suffixes = {str(product['id']): product.get('template_suffix') for product in products}
+        results = {'deleted': [], 'failed': [], 'not_found': [], 'templates_deleted': 0}
+
+        def record(product_id, outcome):
+            results[outcome].append(product_id)
+            if on_progress:
+                on_progress(product_id, outcome)
+
+        for product_id in product_ids:
+            if product_id not in suffixes:
+                record(product_id, 'not_found')
+
+        async def delete_one(product_id):
+            try:
+                deleted = await self._delete_product_only(product_id)
+            except Exception as e:
+                current_app.logger.error(f"Error deleting product {product_id}: {str(e)}")
+                deleted = False
+            record(product_id, 'deleted' if deleted else 'failed')
+
+        await asyncio.gather(*(delete_one(product_id) for product_id in suffixes))
+        if results['deleted']:
+            current_app.logger.info(f"Deleted {len(results['deleted'])} products")
+            self._helpers._mirror_delete(results['deleted'])
+
+        asset_keys = {
+            f'templates/product.{suffixes[product_id]}.json'
+            for product_id in results['deleted'] if suffixes[product_id]
+        }
+        if asset_keys:
+            active_theme = await self.get_active_theme()
+            if active_theme:
+                deleted = await asyncio.gather(
+                    *(self.delete_asset(active_theme['id'], key) for key in asset_keys),
+                    return_exceptions=True
+                )
+                results['templates_deleted'] = sum(1 for result in deleted if result is True)
+        return results
+
+    def run_batch(self, *calls, return_exceptions=False):
+        """Run coroutine-returning callables concurrently and wait for all of them
+
+        Safe to call from regular (blocking) Flask views.
+
+        Args:
+            *calls: Callables taking this service and returning a coroutine
+            return_exceptions (bool): Return exceptions in place of results instead of raising
+
+        Returns:
+            list: Results in the order of the calls
+        """
+        async def runner():
+            async with self:
+                return await asyncio.gather(
+                    *(call(self) for call in calls),
+                    return_exceptions=return_exceptions
+                )
+
+        return asyncio.run(runner())
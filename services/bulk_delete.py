@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import redis
+from flask import current_app
+
+# Largest number of products one job accepts
+MAX_BULK_DELETE_PRODUCTS = 1000
+# Deletes in flight at once per job; the store's rate bucket still paces them
+DEFAULT_BULK_DELETE_CONCURRENCY = 8
+# Finished jobs kept for progress lookups, per worker and in Redis
+MAX_FINISHED_JOBS = 100
+JOB_TTL = 3600
+# Minimum seconds between progress writes to Redis while a job runs
+PROGRESS_PUBLISH_INTERVAL = 0.5
+KEY_PREFIX = 'generify:jobs:bulk_delete'
+
+
+def _is_product_id(value):
+    """Whether value is a positive integer written in ASCII digits"""
+    return value.isascii() and value.isdigit() and int(value) > 0
+
+
+class BulkDeleteJob:
+    """Progress of one bulk product deletion"""
+
+    def __init__(self, store, product_ids):
+        self.id = uuid.uuid4().hex
+        self.store = store
+        self.product_ids = product_ids
+        self.status = 'queued'
+        self.deleted = 0
+        self.failed = []
+        self.not_found = []
+        self.templates_deleted = 0
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, product_id, outcome):
+        with self._lock:
+            if outcome == 'deleted':
+                self.deleted += 1
+            elif outcome == 'failed':
+                self.failed.append(product_id)
+            else:
+                self.not_found.append(product_id)
+
+    def to_dict(self):
+        with self._lock:
+            total = len(self.product_ids)
+            done = self.deleted + len(self.failed) + len(self.not_found)
+            return {
+                'id': self.id,
+                'store': self.store,
+                'status': self.status,
+                'total': total,
+                'processed': done,
+                'deleted': self.deleted,
+                'failed': list(self.failed),
+                'not_found': list(self.not_found),
+                'templates_deleted': self.templates_deleted,
+                'progress': round(done / total * 100, 1) if total else 100.0,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+
+class BulkDeleteJobs:
+    """Runs bulk product deletions in background threads and tracks their progress
+
+    Each job deletes its products through AsyncShopifyService.delete_products on
+    its own thread, so the request that starts it returns immediately. Progress
+    is kept in memory and, when REDIS_URL is set, published to Redis so a
+    status request served by another gunicorn worker sees it too.
+    """
+
+    def __init__(self, redis_url=None, concurrency=DEFAULT_BULK_DELETE_CONCURRENCY):
+        self.concurrency = concurrency
+        self._redis = redis.from_url(redis_url) if redis_url else None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, shopify_service, product_ids):
+        """Start deleting products in the background
+
+        Args:
+            shopify_service (ShopifyService): Client of the store to delete from
+            product_ids (list): Products to delete
+
+        Returns:
+            BulkDeleteJob: The queued job
+
+        Raises:
+            ValueError: If no ids, too many ids or an id that is not a positive integer is given
+        """
+        product_ids = list(dict.fromkeys(str(product_id).strip() for product_id in product_ids))
+        if not product_ids:
+            raise ValueError("No product ids given")
+        invalid = [product_id for product_id in product_ids if not _is_product_id(product_id)]
+        if invalid:
+            raise ValueError(f"Product ids must be positive integers, got: {', '.join(invalid)}")
+        product_ids = list(dict.fromkeys(str(int(product_id)) for product_id in product_ids))
+        if len(product_ids) > MAX_BULK_DELETE_PRODUCTS:
+            raise ValueError(f"At most {MAX_BULK_DELETE_PRODUCTS} products can be deleted per job")
+
+        shopify_service._init_config()
+        job = BulkDeleteJob(shopify_service._store_key(), product_ids)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        self._publish(job)
+
+        app = current_app._get_current_object()
+        threading.Thread(
+            target=self._run, args=(app, job, shopify_service), name=f"bulk-delete-{job.id[:8]}", daemon=True
+        ).start()
+        return job
+
+    def _run(self, app, job, shopify_service):
+        from services.async_shopify_service import AsyncShopifyService
+
+        last_publish = [0.0]
+
+        def on_progress(product_id, outcome):
+            job.record(product_id, outcome)
+            now = time.monotonic()
+            if now - last_publish[0] >= PROGRESS_PUBLISH_INTERVAL:
+                last_publish[0] = now
+                self._publish(job)
+
+        with app.app_context():
+            job.status = 'running'
+            self._publish(job)
+            started = time.monotonic()
+            try:
+                service = AsyncShopifyService.from_service(shopify_service, max_concurrency=self.concurrency)
+                results, = service.run_batch(lambda s: s.delete_products(job.product_ids, on_progress))
+                job.templates_deleted = results['templates_deleted']
+                job.status = 'completed'
+                app.logger.info(
+                    f"Bulk delete {job.id} on {job.store}: {len(results['deleted'])} deleted, "
+                    f"{len(results['failed'])} failed in {time.monotonic() - started:.1f}s"
+                )
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+                app.logger.error(f"Bulk delete {job.id} on {job.store} failed: {str(e)}")
+            finally:
+                job.finished_at = time.time()
+                self._publish(job)
+
+    def _trim(self):
+        """Forget the oldest finished jobs; called with the lock held"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def _publish(self, job):
+        if self._redis is None:
+            return
+        try:
+            self._redis.setex(f"{KEY_PREFIX}:{job.id}", JOB_TTL, json.dumps(job.to_dict()))
+        except redis.RedisError as e:
+            current_app.logger.warning(f"Could not publish bulk delete progress: {str(e)}")
+
+    def get(self, job_id, store):
+        """Get the progress of a job started for a store
+
+        Returns:
+            dict: Job progress, or None if the job is unknown or belongs to another store
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        data = job.to_dict() if job is not None else None
+        if data is None and self._redis is not None:
+            try:
+                raw = self._redis.get(f"{KEY_PREFIX}:{job_id}")
+            except redis.RedisError as e:
+                current_app.logger.warning(f"Could not read bulk delete progress: {str(e)}")
+                raw = None
+            data = json.loads(raw) if raw is not None else None
+        if data is None or data['store'] != store:
+            return None
+        return data
+
+
+_bulk_delete_jobs = None
+_bulk_delete_jobs_lock = threading.Lock()
+
+
+def get_bulk_delete_jobs():
+    """Get the process-wide bulk delete job runner"""
+    global _bulk_delete_jobs
+    if _bulk_delete_jobs is None:
+        with _bulk_delete_jobs_lock:
+            if _bulk_delete_jobs is None:
+                _bulk_delete_jobs = BulkDeleteJobs(
+                    current_app.config.get('REDIS_URL') or os.environ.get('REDIS_URL'),
+                    concurrency=current_app.config.get('BULK_DELETE_CONCURRENCY', DEFAULT_BULK_DELETE_CONCURRENCY)
+                )
+    return _bulk_delete_jobs
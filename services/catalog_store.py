@@ -0,0 +1,417 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+DEFAULT_CATALOG_DB_PATH = 'catalog.sqlite3'
+
+# How long a deleted product's tombstone is kept; Shopify retries a webhook for up to 48 hours
+PRODUCT_TOMBSTONE_TTL = 7 * 24 * 3600
+
+# Sortable product columns and the SQL expression each one sorts by
+PRODUCT_SORT_COLUMNS = {
+    'id': 'id',
+    'title': 'title COLLATE NOCASE',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    store TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    title TEXT,
+    handle TEXT,
+    status TEXT,
+    vendor TEXT,
+    product_type TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (store, id)
+);
+CREATE INDEX IF NOT EXISTS idx_products_updated_at ON products (store, updated_at);
+CREATE INDEX IF NOT EXISTS idx_products_status ON products (store, status);
+CREATE INDEX IF NOT EXISTS idx_products_vendor ON products (store, vendor);
+CREATE INDEX IF NOT EXISTS idx_products_type ON products (store, product_type);
+CREATE INDEX IF NOT EXISTS idx_products_title ON products (store, title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_products_created_at ON products (store, created_at);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    store TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_sync REAL,
+    last_reconcile REAL
+);
+
+CREATE TABLE IF NOT EXISTS product_tombstones (
+    store TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    deleted_at REAL NOT NULL,
+    PRIMARY KEY (store, id)
+);
+CREATE INDEX IF NOT EXISTS idx_product_tombstones_deleted_at ON product_tombstones (deleted_at);
+"""
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_timestamp(value):
+    """Convert a Shopify ISO 8601 timestamp to epoch seconds
+
+    Naive timestamps are taken as UTC.
+
+    Returns:
+        float: Epoch seconds, or None if value is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class CatalogStore:
+    """Local SQLite mirror of each connected store's product catalog
+
+    One connection is opened per thread; WAL mode lets several gunicorn
+    workers read while another one syncs.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def upsert_products(self, store, products):
+        """Insert or replace products in the mirror
+
+        A row is never replaced by an older version of the same product, and
+        a deleted product only comes back with an updated_at newer than its
+        deletion, so late or replayed webhooks can't roll the mirror back.
+
+        Args:
+            store (str): Store key (shop domain)
+            products (list): Normalized product dicts
+
+        Returns:
+            str: Greatest updated_at among the given products, or None
+        """
+        rows = [
+            (
+                store,
+                int(product['id']),
+                product.get('title'),
+                product.get('handle'),
+                product.get('status'),
+                product.get('vendor'),
+                product.get('product_type'),
+                product.get('created_at'),
+                product.get('updated_at'),
+                json.dumps(product)
+            )
+            for product in products
+            if product.get('id') is not None
+        ]
+        if not rows:
+            return None
+        newest = max((row[8] for row in rows if row[8]), default=None)
+
+        with self._connect() as conn:
+            tombstones = self._get_tombstones(conn, store, [row[1] for row in rows])
+            if tombstones:
+                rows = [row for row in rows if not self._is_buried(row, tombstones)]
+                conn.executemany(
+                    'DELETE FROM product_tombstones WHERE store = ? AND id = ?',
+                    [(store, row[1]) for row in rows if row[1] in tombstones]
+                )
+            conn.executemany(
+                """
+                INSERT INTO products (store, id, title, handle, status, vendor, product_type, created_at, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (store, id) DO UPDATE SET
+                    title = excluded.title,
+                    handle = excluded.handle,
+                    status = excluded.status,
+                    vendor = excluded.vendor,
+                    product_type = excluded.product_type,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at,
+                    data = excluded.data
+                WHERE excluded.updated_at IS NULL
+                    OR products.updated_at IS NULL
+                    OR excluded.updated_at >= products.updated_at
+                """,
+                rows
+            )
+        return newest
+
+    @staticmethod
+    def _get_tombstones(conn, store, product_ids):
+        """Map each deleted product among product_ids to its deletion time"""
+        tombstones = {}
+        product_ids = list(product_ids)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            tombstones.update(conn.execute(
+                f'SELECT id, deleted_at FROM product_tombstones WHERE store = ? AND id IN ({placeholders})',
+                [store, *chunk]
+            ).fetchall())
+        return tombstones
+
+    @staticmethod
+    def _is_buried(row, tombstones):
+        """Whether a product row predates its product's deletion"""
+        deleted_at = tombstones.get(row[1])
+        if deleted_at is None:
+            return False
+        updated_at = parse_timestamp(row[8])
+        return updated_at is None or updated_at <= deleted_at
+
+    def delete_products(self, store, product_ids, deleted_at=None):
+        """Remove products from the mirror
+
+        A tombstone is kept for each product so that an update delivered
+        after the deletion can't bring it back.
+
+        Args:
+            store (str): Store key (shop domain)
+            product_ids (iterable): Ids of the deleted products
+            deleted_at (float): Epoch seconds of the deletion, defaults to now
+        """
+        now = time.time()
+        deleted_at = now if deleted_at is None else deleted_at
+        product_ids = [int(product_id) for product_id in product_ids]
+        with self._connect() as conn:
+            conn.executemany(
+                'DELETE FROM products WHERE store = ? AND id = ?',
+                [(store, product_id) for product_id in product_ids]
+            )
+            conn.executemany(
+                """
+                INSERT INTO product_tombstones (store, id, deleted_at) VALUES (?, ?, ?)
+                ON CONFLICT (store, id) DO UPDATE SET deleted_at = MAX(deleted_at, excluded.deleted_at)
+                """,
+                [(store, product_id, deleted_at) for product_id in product_ids]
+            )
+            conn.execute(
+                'DELETE FROM product_tombstones WHERE deleted_at < ?',
+                (now - PRODUCT_TOMBSTONE_TTL,)
+            )
+
+    def retain_products(self, store, product_ids):
+        """Delete every mirrored product of a store that is not in product_ids
+
+        Returns:
+            int: Number of products removed
+        """
+        keep = {int(product_id) for product_id in product_ids}
+        conn = self._connect()
+        existing = {row[0] for row in conn.execute('SELECT id FROM products WHERE store = ?', (store,))}
+        stale = existing - keep
+        if stale:
+            self.delete_products(store, stale)
+        return len(stale)
+
+    def get_product(self, store, product_id):
+        """Get a single mirrored product, or None"""
+        row = self._connect().execute(
+            'SELECT data FROM products WHERE store = ? AND id = ?',
+            (store, int(product_id))
+        ).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def iter_products(self, store):
+        """Stream every mirrored product of a store, newest first"""
+        cursor = self._connect().execute(
+            'SELECT data FROM products WHERE store = ? ORDER BY id DESC',
+            (store,)
+        )
+        for row in cursor:
+            yield json.loads(row['data'])
+
+    def get_products(self, store):
+        """Get every mirrored product of a store"""
+        return list(self.iter_products(store))
+
+    def get_products_page(self, store, limit, offset=0):
+        """Get one page of mirrored products, newest first"""
+        rows = self._connect().execute(
+            'SELECT data FROM products WHERE store = ? ORDER BY id DESC LIMIT ? OFFSET ?',
+            (store, int(limit), int(offset))
+        ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def query_products(self, store, limit=50, cursor=None, sort='id', order='desc',
+                       status=None, vendor=None, product_type=None, title_prefix=None):
+        """Get one page of mirrored products using keyset pagination over the indexes
+
+        Args:
+            store (str): Store key (shop domain)
+            limit (int): Products per page
+            cursor (str): Cursor of the previous page's last row, or None for the first page
+            sort (str): One of PRODUCT_SORT_COLUMNS
+            order (str): 'asc' or 'desc'
+            status, vendor, product_type (str): Exact-match filters
+            title_prefix (str): Case-insensitive title prefix
+
+        Returns:
+            tuple: (products, cursor of the next page or None)
+        """
+        if sort not in PRODUCT_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort}', use one of: {', '.join(PRODUCT_SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+
+        column = PRODUCT_SORT_COLUMNS[sort]
+        clauses, params = ['store = ?'], [store]
+        for name, value in (('status', status), ('vendor', vendor), ('product_type', product_type)):
+            if value is not None:
+                clauses.append(f'{name} = ?')
+                params.append(value)
+        if title_prefix:
+            escaped = title_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            params.append(f'{escaped}%')
+        if cursor:
+            # Row-value comparison continues right after the previous page's last (sort key, id)
+            clauses.append(f"({column}, id) {'<' if order == 'desc' else '>'} (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        direction = order.upper()
+        rows = self._connect().execute(
+            f"""
+            SELECT id, {sort} AS sort_value, data FROM products
+            WHERE {' AND '.join(clauses)}
+            ORDER BY {column} {direction}, id {direction}
+            LIMIT ?
+            """,
+            (*params, int(limit) + 1)
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]['sort_value'], rows[-1]['id']])
+        return [json.loads(row['data']) for row in rows], next_cursor
+
+    def get_variant_stats(self, store):
+        """Aggregate variant prices and inventory of a store inside SQLite
+
+        Only variants with a price are counted, like the dashboard always did.
+
+        Returns:
+            dict: priced_variants, total_price and inventory_value
+        """
+        row = self._connect().execute(
+            """
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(price), 0),
+                COALESCE(SUM(price * inventory), 0)
+            FROM (
+                SELECT
+                    CAST(json_extract(variant.value, '$.price') AS REAL) AS price,
+                    CAST(COALESCE(json_extract(variant.value, '$.inventory_quantity'), 0) AS INTEGER) AS inventory
+                FROM products, json_each(products.data, '$.variants') AS variant
+                WHERE products.store = ?
+            )
+            WHERE price IS NOT NULL AND price != 0
+            """,
+            (store,)
+        ).fetchone()
+        return {'priced_variants': row[0], 'total_price': row[1], 'inventory_value': row[2]}
+
+    def count_products(self, store):
+        """Count mirrored products of a store"""
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM products WHERE store = ?', (store,)
+        ).fetchone()[0]
+
+    def get_fingerprint(self, store):
+        """Get (product count, greatest updated_at) of a store's mirrored catalog"""
+        row = self._connect().execute(
+            'SELECT COUNT(*), MAX(updated_at) FROM products WHERE store = ?', (store,)
+        ).fetchone()
+        return row[0], row[1]
+
+    def get_sync_state(self, store):
+        """Get the sync watermark and timestamps of a store, or None if never synced"""
+        row = self._connect().execute(
+            'SELECT watermark, last_sync, last_reconcile FROM sync_state WHERE store = ?',
+            (store,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def set_sync_state(self, store, watermark=None, reconciled=False):
+        """Record a finished sync, advancing the watermark if one is given"""
+        now = time.time()
+        state = self.get_sync_state(store) or {}
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO sync_state (store, watermark, last_sync, last_reconcile)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (store) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    last_sync = excluded.last_sync,
+                    last_reconcile = excluded.last_reconcile
+                """,
+                (
+                    store,
+                    max(filter(None, [watermark, state.get('watermark')]), default=None),
+                    now,
+                    now if reconciled else state.get('last_reconcile')
+                )
+            )
+
+
+_catalog_store = None
+_catalog_store_lock = threading.Lock()
+
+
+def get_catalog_store(path=None):
+    """Get the process-wide catalog store, creating it on first use"""
+    global _catalog_store
+    if _catalog_store is None:
+        with _catalog_store_lock:
+            if _catalog_store is None:
+                _catalog_store = CatalogStore(path or os.environ.get('CATALOG_DB_PATH', DEFAULT_CATALOG_DB_PATH))
+    return _catalog_store
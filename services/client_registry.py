@@ -0,0 +1,249 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from flask import current_app, session, has_request_context
+from services.shopify_http import build_session, ValidatorCache, DEFAULT_POOL_MAXSIZE, DEFAULT_TIMEOUT
+from services.shopify_service import ShopifyService
+
+# Connected stores kept warm per worker; the least recently used is dropped first
+DEFAULT_MAX_CLIENTS = 32
+# Clients unused for this many seconds are closed on the next lookup
+DEFAULT_CLIENT_IDLE_TIMEOUT = 900
+# Conditional-GET bodies kept per store
+DEFAULT_CLIENT_CACHE_SIZE = 128
+
+
+class StoreDisconnectedError(ValueError):
+    """The session names a store whose token is no longer known"""
+
+
+def normalize_store(store_url):
+    """Reduce a store URL ("https://shop.myshopify.com/", "SHOP.myshopify.com") to its host"""
+    store_url = store_url.strip()
+    if '://' not in store_url:
+        store_url = f"https://{store_url}"
+    return urlparse(store_url).netloc.lower()
+
+
+class _Client:
+    def __init__(self, service, access_token):
+        self.service = service
+        self.access_token = access_token
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.requests = 0
+
+
+class ShopifyClientRegistry:
+    """Per-store ShopifyService clients, each with its own connection pool and response cache
+
+    A client is bound to one store and token when it is created and never
+    re-initialized, so concurrent requests for different stores can't see each
+    other's headers. Calls are still paced by the store's process-wide rate
+    bucket (services/rate_limiter.py), which every client of that store shares.
+    Idle clients are closed after idle_timeout seconds and, beyond maxsize, the
+    least recently used client is dropped. A changed token replaces the client.
+
+    Tokens of stores connected through connect() are kept here, keyed by store,
+    so the user's session only has to carry the store URL; a worker that hasn't
+    seen the store yet reads its token from the users table.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAX_CLIENTS, idle_timeout=DEFAULT_CLIENT_IDLE_TIMEOUT,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT, cache_size=DEFAULT_CLIENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._clients = OrderedDict()
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, store_url, access_token):
+        """Get the client of a store, creating it on first use
+
+        Args:
+            store_url (str): Store domain, e.g. "shop.myshopify.com"
+            access_token (str): Admin API access token of the store
+
+        Returns:
+            ShopifyService: Client bound to the store
+        """
+        if not store_url or not access_token:
+            raise ValueError("A store URL and access token are required")
+        store = normalize_store(store_url)
+        now = time.monotonic()
+        closing = []
+
+        with self._lock:
+            client = self._clients.get(store)
+            if client is not None and client.access_token != access_token:
+                closing.append(self._clients.pop(store))
+                client = None
+            if client is None:
+                client = _Client(self._build(store, access_token), access_token)
+                self._clients[store] = client
+                self.created += 1
+            client.last_used = now
+            client.requests += 1
+            self._clients.move_to_end(store)
+            closing.extend(self._evict(now))
+
+        for stale in closing:
+            self._close(stale)
+        return client.service
+
+    def connect(self, store_url, access_token):
+        """Remember the token of a store whose credentials were verified and get its client"""
+        if not store_url or not access_token:
+            raise ValueError("A store URL and access token are required")
+        with self._lock:
+            self._tokens[normalize_store(store_url)] = access_token
+        return self.get(store_url, access_token)
+
+    def token(self, store_url):
+        """Token of a connected store, or None if it isn't known"""
+        store = normalize_store(store_url)
+        with self._lock:
+            access_token = self._tokens.get(store)
+        if access_token is None:
+            access_token = self._load_token(store)
+            if access_token is not None:
+                with self._lock:
+                    self._tokens.setdefault(store, access_token)
+        return access_token
+
+    @staticmethod
+    def _load_token(store):
+        """Read the token the session's user saved when connecting the store"""
+        supabase = getattr(current_app, 'supabase', None)
+        user_id = (session.get('user') or {}).get('id') if has_request_context() else None
+        if supabase is None or not user_id:
+            return None
+        try:
+            rows = supabase.table('users').select('shopify_store_url, shopify_api_key').eq('id', user_id).execute().data
+        except Exception as e:
+            current_app.logger.warning(f"Could not load the token of {store}: {str(e)}")
+            return None
+        for row in rows or []:
+            if row.get('shopify_store_url') and normalize_store(row['shopify_store_url']) == store:
+                return row.get('shopify_api_key')
+        return None
+
+    def peek(self, store_url):
+        """Get the existing client of a store without creating or touching it"""
+        with self._lock:
+            client = self._clients.get(normalize_store(store_url))
+        return client.service if client is not None else None
+
+    def default(self):
+        """Client of the store configured through SHOP_URL / ACCESS_TOKEN"""
+        store_url = current_app.config.get('SHOP_URL')
+        access_token = current_app.config.get('ACCESS_TOKEN')
+        if not store_url or not access_token:
+            raise ValueError("Missing Shopify configuration. Please check SHOP_URL and ACCESS_TOKEN in config.py")
+        return self.get(store_url, access_token)
+
+    def current(self):
+        """Client of the store connected in the user's session, or the configured store
+
+        Raises:
+            StoreDisconnectedError: The session names a store but its token can't
+                be found; never silently served from the configured store instead
+        """
+        if has_request_context():
+            store_url = session.get('store_url')
+            if store_url:
+                access_token = self.token(store_url)
+                if not access_token:
+                    raise StoreDisconnectedError(f"Store {store_url} is no longer connected, please connect it again")
+                return self.get(store_url, access_token)
+        return self.default()
+
+    def remove(self, store_url):
+        """Close and forget the client and token of a store (e.g. after its token was revoked)"""
+        with self._lock:
+            self._tokens.pop(normalize_store(store_url), None)
+            client = self._clients.pop(normalize_store(store_url), None)
+        if client is not None:
+            self._close(client)
+        return client is not None
+
+    def _build(self, store, access_token):
+        service = ShopifyService(
+            session=build_session(pool_maxsize=self.pool_maxsize, timeout=self.timeout),
+            validator_cache=ValidatorCache(maxsize=self.cache_size)
+        )
+        service.initialize(store, access_token)
+        return service
+
+    def _evict(self, now):
+        """Unlink idle and over-capacity clients; called with the lock held"""
+        evicted = []
+        for store, client in list(self._clients.items()):
+            if now - client.last_used <= self.idle_timeout:
+                break  # Ordered by last use, the rest are fresher
+            evicted.append(self._clients.pop(store))
+        while len(self._clients) > self.maxsize:
+            evicted.append(self._clients.popitem(last=False)[1])
+        self.evicted += len(evicted)
+        return evicted
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.service.close()
+        except Exception:
+            pass
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self._lock:
+            clients = list(self._clients.items())
+            stats = {
+                'clients': len(clients),
+                'connected_stores': len(self._tokens),
+                'maxsize': self.maxsize,
+                'idle_timeout': self.idle_timeout,
+                'created': self.created,
+                'evicted': self.evicted
+            }
+        stats['stores'] = [
+            {
+                'store': store,
+                'requests': client.requests,
+                'idle_seconds': round(now - client.last_used, 1),
+                'response_cache': client.service.get_cache_stats()
+            }
+            for store, client in clients
+        ]
+        return stats
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry():
+    """Get the process-wide client registry, sized from the app config on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = current_app.config
+                _registry = ShopifyClientRegistry(
+                    maxsize=config.get('SHOPIFY_MAX_CLIENTS', DEFAULT_MAX_CLIENTS),
+                    idle_timeout=config.get('SHOPIFY_CLIENT_IDLE_TIMEOUT', DEFAULT_CLIENT_IDLE_TIMEOUT),
+                    pool_maxsize=config.get('SHOPIFY_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE),
+                    timeout=config.get('SHOPIFY_TIMEOUT', DEFAULT_TIMEOUT)
+                )
+    return _registry
+
+
+def get_client_registry_stats():
+    """Stats of the client registry, or None if it hasn't been used in this process"""
+    return _registry.get_stats() if _registry is not None else None
@@ -0,0 +1,52 @@
+import numpy as np
+
+# Fewer points than this can't keep both ends plus a shape in between
+MIN_POINTS = 3
+
+
+def lttb_indices(values, max_points):
+    """Pick the points of a series to keep with Largest-Triangle-Three-Buckets
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket, so peaks and dips survive the reduction.
+
+    Args:
+        values (list): Y values, evenly spaced on the x axis (one per day)
+        max_points (int): Number of points to keep
+
+    Returns:
+        ndarray: Sorted positions of the kept points
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = y.size
+    max_points = max(int(max_points), MIN_POINTS)
+    if n <= max_points:
+        return np.arange(n)
+
+    # max_points - 2 buckets share the points between the fixed first and last
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < edges.size:
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            next_x = (next_start + next_end - 1) / 2
+            next_y = y[next_start:next_end].mean()
+        else:
+            next_x, next_y = n - 1, y[-1]
+
+        x = np.arange(start, end)
+        area = np.abs((previous - next_x) * (y[start:end] - y[previous]) - (previous - x) * (next_y - y[previous]))
+        previous = start + int(area.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample_rows(rows, max_points, key):
+    """Downsample a list of per-day dicts, choosing rows by the shape of one field"""
+    if not max_points or len(rows) <= max(int(max_points), MIN_POINTS):
+        return rows
+    return [rows[i] for i in lttb_indices([row[key] for row in rows], max_points)]
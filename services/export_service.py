@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Rows written per response chunk; small enough that the first chunk goes out
+# as soon as the first page arrives
+EXPORT_CHUNK_ROWS = 100
+
+# Default CSV columns; NDJSON exports whole products unless fields are given
+PRODUCT_EXPORT_FIELDS = ('id', 'title', 'handle', 'status', 'vendor', 'product_type', 'tags', 'created_at', 'updated_at')
+# Default order columns in both formats. Orders carry customer data (email,
+# customer, addresses...), which is only exported when asked for with fields=
+ORDER_EXPORT_FIELDS = (
+    'id', 'name', 'created_at', 'financial_status', 'fulfillment_status',
+    'currency', 'subtotal_price', 'total_tax', 'total_discounts', 'total_price'
+)
+
+
+def parse_fields(value):
+    """Turn a comma-separated fields parameter into a tuple, or None if empty"""
+    fields = tuple(field.strip() for field in (value or '').split(',') if field.strip())
+    return fields or None
+
+
+def _project(record, fields):
+    return {field: record.get(field) for field in fields} if fields else record
+
+
+def iter_ndjson(records, fields=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Encode records as newline-delimited JSON, a chunk of rows at a time
+
+    Args:
+        records (iterable): Records to export, consumed lazily
+        fields (tuple): Optional keys to keep from each record
+        chunk_rows (int): Rows per yielded chunk
+
+    Yields:
+        str: Chunks of NDJSON lines
+    """
+    lines = []
+    try:
+        for record in records:
+            lines.append(json.dumps(_project(record, fields), default=str))
+            if len(lines) >= chunk_rows:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+    except Exception:
+        # Rows read before a failing page still go out
+        if lines:
+            yield '\n'.join(lines) + '\n'
+        raise
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_csv(records, fields, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Encode records as CSV, a chunk of rows at a time
+
+    The header row is sent first. Nested values (lists, dicts) are written as JSON.
+
+    Args:
+        records (iterable): Records to export, consumed lazily
+        fields (tuple): Columns to write
+        chunk_rows (int): Rows per yielded chunk
+
+    Yields:
+        str: Chunks of CSV text
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(fields)
+    yield flush()
+
+    rows = 0
+    try:
+        for record in records:
+            writer.writerow([
+                json.dumps(value, default=str) if isinstance(value, (list, dict)) else value
+                for value in (record.get(field) for field in fields)
+            ])
+            rows += 1
+            if rows >= chunk_rows:
+                yield flush()
+                rows = 0
+    except Exception:
+        # Rows read before a failing page still go out
+        if rows:
+            yield flush()
+        raise
+    if rows:
+        yield flush()
+
+
+def iter_export(records, export_format, fields=None, default_fields=()):
+    """Encode records in an export format
+
+    Args:
+        records (iterable): Records to export, consumed lazily
+        export_format (str): 'ndjson' or 'csv'
+        fields (tuple): Optional fields to export
+        default_fields (tuple): CSV columns used when no fields are given
+
+    Yields:
+        str: Response chunks
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{export_format}', use one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'csv':
+        return iter_csv(records, fields or default_fields)
+    return iter_ndjson(records, fields)
+
+
+def iter_guarded(chunks, export_format, on_error=None):
+    """Pass export chunks through, making a failure mid-stream visible to the client
+
+    The status line is long gone when the source fails, so NDJSON exports end
+    with an {"error": ..., "complete": false} record. CSV has no room for one:
+    the error is re-raised and the server drops the connection before the final
+    chunk, which clients report as an incomplete download.
+
+    Args:
+        chunks (iterable): Chunks from iter_export
+        export_format (str): 'ndjson' or 'csv'
+        on_error (callable): Called with the exception, e.g. to log it
+
+    Yields:
+        str: Response chunks
+    """
+    try:
+        yield from chunks
+    except Exception as e:
+        if on_error is not None:
+            on_error(e)
+        if export_format != 'ndjson':
+            raise
+        yield json.dumps({'error': str(e), 'complete': False}) + '\n'
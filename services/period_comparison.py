@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+
+class PeriodComparison:
+    """Compare a period with the one right before it from a single doubled window
+
+    Data for [previous_start, end_date] is fetched (or read from the rollups)
+    once and every row is bucketed by its day into the current period
+    [start_date, end_date] or the previous one [previous_start, start_date), so
+    trends never cost a second upstream call.
+
+        comparison = PeriodComparison(start_date, end_date)
+        rows = rollups.get_daily(store, comparison.window_start_day, comparison.end_day)
+        current_rows, previous_rows = comparison.split(rows)
+        totals = comparison.totals(rows, ['orders', 'revenue'])
+    """
+
+    def __init__(self, start_date: datetime, end_date: datetime):
+        self.start_date = start_date
+        self.end_date = end_date
+        # Both periods span the same number of calendar days, end day included
+        days = (end_date.date() - start_date.date()).days + 1
+        self.previous_start = start_date - timedelta(days=days)
+        self.start_day = start_date.strftime('%Y-%m-%d')
+        self.end_day = end_date.strftime('%Y-%m-%d')
+        self.window_start_day = self.previous_start.strftime('%Y-%m-%d')
+
+    def bucket(self, day):
+        """Get 'current', 'previous' or None for a 'YYYY-MM-DD' day (or ISO timestamp)"""
+        day = (day or '')[:10]
+        if not day:
+            return None
+        if self.start_day <= day <= self.end_day:
+            return 'current'
+        if self.window_start_day <= day < self.start_day:
+            return 'previous'
+        return None
+
+    def split(self, rows, day_key='day'):
+        """Split rows of the doubled window into (current, previous) lists"""
+        current, previous = [], []
+        for row in rows:
+            bucket = self.bucket(row.get(day_key))
+            if bucket == 'current':
+                current.append(row)
+            elif bucket == 'previous':
+                previous.append(row)
+        return current, previous
+
+    def totals(self, rows, metrics, day_key='day'):
+        """Sum metrics per period in one pass over the rows
+
+        Returns:
+            dict: {'current': {metric: total}, 'previous': {metric: total}}
+        """
+        totals = {
+            'current': {metric: 0 for metric in metrics},
+            'previous': {metric: 0 for metric in metrics}
+        }
+        for row in rows:
+            bucket = self.bucket(row.get(day_key))
+            if bucket is None:
+                continue
+            for metric in metrics:
+                totals[bucket][metric] += row.get(metric) or 0
+        return totals
+
+    @staticmethod
+    def trend(current_value, previous_value):
+        """Percentage change from the previous value, 0 when there is nothing to compare with"""
+        if not previous_value:
+            return 0
+        return ((current_value - previous_value) / previous_value) * 100
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+import redis
+from flask import current_app
+from services.rate_limiter import get_rate_limiter
+
+# Seconds between warm-up passes; shorter than the analytics cache TTL so warm
+# entries are replaced before they expire
+DEFAULT_PREWARM_INTERVAL = 240
+# Stores with analytics activity in the last this many seconds get warmed
+# (matches PERMANENT_SESSION_LIFETIME)
+DEFAULT_ACTIVE_STORE_WINDOW = 1800
+DEFAULT_PREWARM_TIME_RANGES = ('30d',)
+# Skip a store while less than this share of its API bucket is free
+DEFAULT_MIN_BUCKET_AVAILABLE = 0.5
+LOCK_PREFIX = 'generify:prewarm'
+
+
+class AnalyticsPrewarmer:
+    """Background thread that keeps analytics results warm for recently active stores
+
+    Every worker remembers the stores its users opened analytics for. On each
+    pass the worker takes a per-store Redis lock (SET NX with the pass interval
+    as expiry), so across all gunicorn workers a store is warmed at most once
+    per interval. Without Redis the lock is per process. A store whose Shopify
+    rate bucket is running low is skipped until the next pass, so warming never
+    competes with interactive requests for API budget.
+    """
+
+    def __init__(self, app, redis_url=None, interval=DEFAULT_PREWARM_INTERVAL,
+                 active_window=DEFAULT_ACTIVE_STORE_WINDOW, time_ranges=DEFAULT_PREWARM_TIME_RANGES,
+                 min_bucket_available=DEFAULT_MIN_BUCKET_AVAILABLE):
+        self.app = app
+        self.interval = interval
+        self.active_window = active_window
+        self.time_ranges = tuple(time_ranges)
+        self.min_bucket_available = min_bucket_available
+        self._redis = redis.from_url(redis_url) if redis_url else None
+        self._stores = {}
+        self._local_locks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.passes = 0
+        self.warmed = 0
+        self.skipped_rate_limit = 0
+        self.skipped_locked = 0
+        self.failures = 0
+
+    def touch(self, shopify_service):
+        """Record analytics activity for the store a ShopifyService is bound to"""
+        store = shopify_service._store_key()
+        with self._lock:
+            self._stores[store] = {
+                'store_url': store,
+                'access_token': shopify_service.access_token,
+                'last_seen': time.time()
+            }
+        self.start()
+
+    def start(self):
+        """Start the background thread if it isn't running in this process yet"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='analytics-prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.app.logger.error(f"Analytics pre-warm pass failed: {str(e)}")
+
+    def _active_stores(self):
+        cutoff = time.time() - self.active_window
+        with self._lock:
+            for store in [store for store, entry in self._stores.items() if entry['last_seen'] < cutoff]:
+                del self._stores[store]
+            return list(self._stores.values())
+
+    def _bucket_low(self, store):
+        state = get_rate_limiter(store).get_state()
+        return state['available'] < state['capacity'] * self.min_bucket_available
+
+    def _acquire(self, store):
+        """Claim this pass for a store, across workers when Redis is available"""
+        if self._redis is not None:
+            try:
+                return bool(self._redis.set(f"{LOCK_PREFIX}:{store}", os.getpid(), nx=True, ex=self.interval))
+            except redis.RedisError as e:
+                self.app.logger.warning(f"Pre-warm lock unavailable, using a local lock: {str(e)}")
+        now = time.monotonic()
+        with self._lock:
+            if self._local_locks.get(store, 0) > now:
+                return False
+            self._local_locks[store] = now + self.interval
+            return True
+
+    def run_once(self):
+        """Warm every recently active store once
+
+        Returns:
+            list: Stores that were warmed
+        """
+        from services.client_registry import get_client_registry
+        from services.analytics_service import AnalyticsService
+
+        warmed = []
+        for entry in self._active_stores():
+            store = entry['store_url']
+            if self._bucket_low(store):
+                self.skipped_rate_limit += 1
+                self.app.logger.info(f"Skipping analytics pre-warm for {store}: API bucket is low")
+                continue
+            if not self._acquire(store):
+                self.skipped_locked += 1
+                continue
+
+            with self.app.app_context():
+                try:
+                    analytics_service = AnalyticsService(get_client_registry().get(store, entry['access_token']))
+                    analytics_service.refresh_order_rollups()
+                    for time_range in self.time_ranges:
+                        if self._bucket_low(store):
+                            break
+                        analytics_service.prewarm(time_range)
+                    warmed.append(store)
+                    self.warmed += 1
+                except Exception as e:
+                    self.failures += 1
+                    current_app.logger.warning(f"Analytics pre-warm failed for {store}: {str(e)}")
+
+        self.passes += 1
+        return warmed
+
+    def get_stats(self):
+        with self._lock:
+            active = len(self._stores)
+            running = self._thread is not None and self._thread.is_alive()
+        return {
+            'running': running,
+            'interval': self.interval,
+            'active_stores': active,
+            'passes': self.passes,
+            'warmed': self.warmed,
+            'skipped_rate_limit': self.skipped_rate_limit,
+            'skipped_locked': self.skipped_locked,
+            'failures': self.failures
+        }
+
+
+_prewarmer = None
+_prewarmer_lock = threading.Lock()
+
+
+def get_prewarmer(app=None):
+    """Get the process-wide pre-warmer, creating it from the app config on first use"""
+    global _prewarmer
+    if _prewarmer is None:
+        with _prewarmer_lock:
+            if _prewarmer is None:
+                app = app or current_app._get_current_object()
+                _prewarmer = AnalyticsPrewarmer(
+                    app,
+                    redis_url=app.config.get('REDIS_URL'),
+                    interval=app.config.get('PREWARM_INTERVAL', DEFAULT_PREWARM_INTERVAL),
+                    active_window=app.config.get('PREWARM_ACTIVE_WINDOW', DEFAULT_ACTIVE_STORE_WINDOW),
+                    time_ranges=app.config.get('PREWARM_TIME_RANGES', DEFAULT_PREWARM_TIME_RANGES)
+                )
+    return _prewarmer
+
+
+def get_prewarm_stats():
+    """Stats of the pre-warmer, or None if it hasn't been started in this process"""
+    return _prewarmer.get_stats() if _prewarmer is not None else None
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+
+# Shopify REST defaults: 40 request bucket leaking 2 requests/second. Plus stores
+# get a larger bucket with the same 20 second drain time.
+DEFAULT_BUCKET_SIZE = 40
+BUCKET_DRAIN_SECONDS = 20.0
+
+# Calls kept in reserve so other workers sharing the store's bucket don't hit 429s
+DEFAULT_HEADROOM = 4
+
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class LeakyBucketLimiter:
+    """Client-side mirror of a store's Shopify leaky bucket
+
+    The fill level is estimated locally between calls and corrected from the
+    X-Shopify-Shop-Api-Call-Limit header on every response, so several workers
+    hitting the same store converge on the real server-side level.
+    """
+
+    def __init__(self, store, capacity=DEFAULT_BUCKET_SIZE, headroom=DEFAULT_HEADROOM):
+        self.store = store
+        self.capacity = capacity
+        self.leak_rate = capacity / BUCKET_DRAIN_SECONDS
+        self.headroom = headroom
+        self.level = 0.0
+        self.updated_at = time.monotonic()
+        # Nothing may be sent before this time (set by a 429 backoff)
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _leak(self, now):
+        """Drain the estimated level for the time elapsed since the last update"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.level = max(0.0, self.level - elapsed * self.leak_rate)
+            self.updated_at = now
+
+    def acquire(self):
+        """Reserve a slot in the bucket, sleeping until one is available
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self):
+        """Reserve a slot in the bucket without sleeping
+
+        Asyncio callers use this and await the returned delay themselves.
+
+        Returns:
+            float: Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._leak(now)
+            limit = max(self.capacity - self.headroom, 1)
+            # Callers arriving during a 429 backoff wait it out, then queue as usual
+            hold = max(0.0, self.blocked_until - now)
+            wait = hold + max(0.0, (self.level + 1 - limit) / self.leak_rate)
+            # Reserve the slot now so concurrent callers queue up behind us
+            self.level += 1
+            self.requests += 1
+            if wait:
+                self.throttled += 1
+                self.waited_seconds += wait
+        return wait
+
+    def update(self, response):
+        """Sync the bucket with the call-limit header of a Shopify response"""
+        header = response.headers.get('X-Shopify-Shop-Api-Call-Limit')
+        if not header:
+            return
+        try:
+            used, capacity = (int(part) for part in header.split('/'))
+        except ValueError:
+            return
+
+        with self._lock:
+            if capacity != self.capacity:
+                self.capacity = capacity
+                self.leak_rate = capacity / BUCKET_DRAIN_SECONDS
+            self.level = float(used)
+            self.updated_at = time.monotonic()
+
+    def backoff(self, attempt, retry_after=None):
+        """Sleep after a 429, honouring Retry-After and adding jitter
+
+        Args:
+            attempt (int): Zero-based retry attempt
+            retry_after (str): Value of the Retry-After header, if any
+
+        Returns:
+            float: Seconds slept
+        """
+        delay = self.backoff_delay(attempt, retry_after)
+        time.sleep(delay)
+        return delay
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Record a 429 and compute the jittered delay without sleeping
+
+        Returns:
+            float: Seconds the caller must wait before retrying
+        """
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = min(MAX_BACKOFF_SECONDS, (2 ** attempt) / self.leak_rate)
+        delay += random.uniform(0, 0.5 * max(delay, 1.0))
+
+        with self._lock:
+            # Block every caller until the backoff ends and hold the bucket at the
+            # pacing limit, so requests resume one leak interval apart afterwards
+            now = time.monotonic()
+            self.level = float(max(self.capacity - self.headroom - 1, 0))
+            self.updated_at = now + delay
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.retries += 1
+            self.waited_seconds += delay
+        return delay
+
+    def get_state(self):
+        """Get the current bucket state for metrics"""
+        with self._lock:
+            self._leak(time.monotonic())
+            return {
+                'store': self.store,
+                'level': round(self.level, 2),
+                'capacity': self.capacity,
+                'available': round(max(self.capacity - self.level, 0.0), 2),
+                'leak_rate': self.leak_rate,
+                'blocked_for': round(max(self.blocked_until - time.monotonic(), 0.0), 3),
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'retries': self.retries,
+                'waited_seconds': round(self.waited_seconds, 3)
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(store):
+    """Get the process-wide limiter for a store, creating it on first use"""
+    limiter = _limiters.get(store)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(store, LeakyBucketLimiter(store))
+    return limiter
+
+
+def get_rate_limit_stats():
+    """Get the bucket state of every store this process has talked to"""
+    return [limiter.get_state() for limiter in list(_limiters.values())]
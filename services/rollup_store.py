@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import threading
+import time
+from services.catalog_store import DEFAULT_CATALOG_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_facts (
+    store TEXT NOT NULL,
+    order_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    revenue REAL NOT NULL,
+    units INTEGER NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (store, order_id)
+);
+CREATE INDEX IF NOT EXISTS idx_order_facts_day ON order_facts (store, day);
+
+CREATE TABLE IF NOT EXISTS order_daily_rollups (
+    store TEXT NOT NULL,
+    day TEXT NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    units INTEGER NOT NULL,
+    PRIMARY KEY (store, day)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_state (
+    store TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_refresh REAL
+);
+"""
+
+
+class OrderRollupStore:
+    """Per-store, per-day order count, revenue and units kept in the local SQLite database
+
+    A small fact row is kept per order so an updated order (edit, refund) can
+    replace its old contribution; the daily rollups are recomputed only for the
+    days touched by each batch.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def apply_orders(self, store, orders):
+        """Fold a batch of new or updated orders into the rollups
+
+        An order's facts are never replaced by an older version of it.
+
+        Args:
+            store (str): Store key (shop domain)
+            orders (list): Orders with id, created_at, updated_at, total_price and line_items
+
+        Returns:
+            str: Greatest updated_at in the batch, or None
+        """
+        facts = []
+        for order in orders:
+            day = (order.get('created_at') or '').split('T')[0]
+            if not day or order.get('id') is None:
+                continue
+            facts.append((
+                store,
+                int(order['id']),
+                day,
+                float(order.get('total_price') or 0),
+                sum(int(item.get('quantity') or 0) for item in order.get('line_items', [])),
+                order.get('updated_at')
+            ))
+        if not facts:
+            return None
+
+        days = sorted({fact[2] for fact in facts})
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO order_facts (store, order_id, day, revenue, units, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (store, order_id) DO UPDATE SET
+                    day = excluded.day,
+                    revenue = excluded.revenue,
+                    units = excluded.units,
+                    updated_at = excluded.updated_at
+                WHERE excluded.updated_at IS NULL
+                    OR order_facts.updated_at IS NULL
+                    OR excluded.updated_at >= order_facts.updated_at
+                """,
+                facts
+            )
+            self._rebuild_days(conn, store, days)
+        return max((fact[5] for fact in facts if fact[5]), default=None)
+
+    def delete_orders(self, store, order_ids):
+        """Remove orders from the rollups"""
+        ids = [int(order_id) for order_id in order_ids]
+        with self._connect() as conn:
+            days = [
+                row[0] for row in conn.execute(
+                    f"SELECT DISTINCT day FROM order_facts WHERE store = ? AND order_id IN ({','.join('?' * len(ids))})",
+                    (store, *ids)
+                )
+            ] if ids else []
+            conn.executemany(
+                'DELETE FROM order_facts WHERE store = ? AND order_id = ?',
+                [(store, order_id) for order_id in ids]
+            )
+            self._rebuild_days(conn, store, days)
+
+    @staticmethod
+    def _rebuild_days(conn, store, days):
+        """Recompute the daily rows for the given days from the order facts"""
+        for start in range(0, len(days), 500):
+            chunk = days[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(
+                f"DELETE FROM order_daily_rollups WHERE store = ? AND day IN ({placeholders})",
+                (store, *chunk)
+            )
+            conn.execute(
+                f"""
+                INSERT INTO order_daily_rollups (store, day, orders, revenue, units)
+                SELECT store, day, COUNT(*), SUM(revenue), SUM(units)
+                FROM order_facts
+                WHERE store = ? AND day IN ({placeholders})
+                GROUP BY store, day
+                """,
+                (store, *chunk)
+            )
+
+    def get_daily(self, store, start_day, end_day):
+        """Get the daily rows between two 'YYYY-MM-DD' days, inclusive, oldest first"""
+        rows = self._connect().execute(
+            """
+            SELECT day, orders, revenue, units FROM order_daily_rollups
+            WHERE store = ? AND day BETWEEN ? AND ?
+            ORDER BY day
+            """,
+            (store, start_day, end_day)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_state(self, store):
+        """Get the refresh watermark of a store, or None if it was never refreshed"""
+        row = self._connect().execute(
+            'SELECT watermark, last_refresh FROM rollup_state WHERE store = ?', (store,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def set_state(self, store, watermark=None):
+        """Record a finished refresh, advancing the watermark if one is given"""
+        state = self.get_state(store) or {}
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO rollup_state (store, watermark, last_refresh) VALUES (?, ?, ?)
+                ON CONFLICT (store) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    last_refresh = excluded.last_refresh
+                """,
+                (store, max(filter(None, [watermark, state.get('watermark')]), default=None), time.time())
+            )
+
+
+_rollup_store = None
+_rollup_store_lock = threading.Lock()
+
+
+def get_rollup_store(path=None):
+    """Get the process-wide rollup store, creating it on first use"""
+    global _rollup_store
+    if _rollup_store is None:
+        with _rollup_store_lock:
+            if _rollup_store is None:
+                _rollup_store = OrderRollupStore(path or os.environ.get('CATALOG_DB_PATH', DEFAULT_CATALOG_DB_PATH))
+    return _rollup_store
@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeout applied to every Shopify call that doesn't set its own
+DEFAULT_TIMEOUT = (5, 30)
+
+# Absolute deadline (time.monotonic()) bounding the Shopify calls of the current thread
+_deadline = threading.local()
+
+# Gunicorn runs with --threads 2, so a handful of sockets per host is plenty
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+
+
+@contextmanager
+def request_deadline(seconds):
+    """Bound every Shopify call made on this thread within the block by a deadline
+
+    Calls get at most the time that is left as their connect and read timeout,
+    and fail with requests.Timeout once it has passed, so work that runs past
+    its deadline stops on its own instead of holding its thread. Nested
+    deadlines never extend an outer one.
+    """
+    previous = getattr(_deadline, 'at', None)
+    at = time.monotonic() + seconds
+    _deadline.at = at if previous is None else min(previous, at)
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+def deadline_timeout(timeout=None):
+    """Shrink a (connect, read) timeout to what is left of this thread's deadline
+
+    Returns:
+        The timeout unchanged when no deadline is set
+
+    Raises:
+        requests.Timeout: The deadline has already passed
+    """
+    at = getattr(_deadline, 'at', None)
+    if at is None:
+        return timeout
+    remaining = at - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout("Deadline exceeded before the Shopify call was sent")
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout or DEFAULT_TIMEOUT[0], timeout or DEFAULT_TIMEOUT[1])
+    return min(connect, remaining), min(read, remaining)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to every request"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_session(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                  timeout=DEFAULT_TIMEOUT):
+    """Create a keep-alive session with a sized connection pool
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep
+        pool_maxsize (int): Maximum idle connections kept per host
+        timeout (tuple): Default (connect, read) timeout
+
+    Returns:
+        requests.Session: Session safe to share between threads as long as
+        per-request headers are passed explicitly
+    """
+    session = requests.Session()
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=False
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+def get_pool_stats(session):
+    """Collect reuse statistics for every connection pool of a session
+
+    Args:
+        session (requests.Session): Session created by build_session
+
+    Returns:
+        dict: Per-host counts of requests, new connections and reused connections
+    """
+    stats = {'pid': os.getpid(), 'thread': threading.current_thread().name, 'pools': []}
+    adapter = session.get_adapter('https://')
+    pools = adapter.poolmanager.pools
+
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        num_requests = getattr(pool, 'num_requests', 0)
+        num_connections = getattr(pool, 'num_connections', 0)
+        stats['pools'].append({
+            'host': f"{pool.host}:{pool.port}",
+            'requests': num_requests,
+            'new_connections': num_connections,
+            'reused_connections': max(num_requests - num_connections, 0),
+            'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0,
+            'maxsize': adapter._pool_maxsize
+        })
+
+    return stats
+
+
+class ValidatorCache:
+    """Bounded LRU of parsed response bodies keyed by URL, with their HTTP validators
+
+    Entries are only ever served after the server answers a conditional request
+    with 304 Not Modified, so they can't go stale. Cached bodies are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(url, params=None):
+        """Build a cache key from a URL and its query parameters"""
+        return (url, tuple(sorted((params or {}).items())))
+
+    def conditional_headers(self, key):
+        """Get If-None-Match / If-Modified-Since headers for a cached URL"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key, response, body):
+        """Remember a 200 response body if it carries a validator"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._entries[key] = {'etag': etag, 'last_modified': last_modified, 'body': body}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def revalidated(self, key):
+        """Get the cached body after a 304, or None if it was evicted meanwhile"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['body']
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate):
+        """Drop every entry whose URL matches predicate(url)
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key[0])]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses
+            }
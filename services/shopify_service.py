@@ -1,23 +1,183 @@
 import requests
 from flask import current_app
 import json
-from datetime import datetime, timedelta
-import os
+import threading
+import time
+import copy
+import random
+import string
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from services.shopify_http import build_session, get_pool_stats, deadline_timeout, ValidatorCache, DEFAULT_POOL_MAXSIZE, DEFAULT_TIMEOUT
+from services.rate_limiter import get_rate_limiter
+from services.catalog_store import get_catalog_store, PRODUCT_SORT_COLUMNS, encode_cursor, decode_cursor
+from services.catalog_frame import CatalogFrame
+from services.single_flight import get_single_flight, SHARE_RESULT, SHARE_LOCK, SHARE_LOCAL
+
+# Transparent retries on 429 before the response is handed back to the caller
+MAX_RATE_LIMIT_RETRIES = 5
+
+# How long the resolved main theme is trusted before themes.json is asked again
+ACTIVE_THEME_TTL = 300
+
+# Local catalog mirror: pull changes (updated_at_min) at most this often, and
+# run a full id reconcile to catch deletions at this interval
+CATALOG_SYNC_INTERVAL = 60
+CATALOG_RECONCILE_INTERVAL = 3600
+# Products per dashboard grid page
+DASHBOARD_PAGE_SIZE = 48
+
+# Product fields Shopify sets itself; never sent back on updates
+READ_ONLY_PRODUCT_FIELDS = ('id', 'admin_graphql_api_id', 'created_at', 'updated_at')
+
+# Runs the independent upstream steps of a write flow side by side
+_write_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='shopify-write')
+# Refreshes stale catalog mirrors off the request path
+_sync_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='catalog-sync')
 
 class ShopifyService:
-    def __init__(self):
+    # Keep-alive session shared by every ShopifyService in this worker process
+    _session = None
+    _session_lock = threading.Lock()
+
+    # Parsed bodies of conditional GETs (ETag / Last-Modified), shared by all stores
+    _validator_cache = ValidatorCache(maxsize=256)
+
+    # Per-store active theme cache: {store: (theme, expires_at)}
+    _active_themes = {}
+    _active_themes_lock = threading.Lock()
+
+    # Per-store lock held while the catalog mirror syncs: {store: Lock}
+    _catalog_sync_locks = {}
+    _catalog_sync_locks_lock = threading.Lock()
+
+    def __init__(self, session=None, validator_cache=None):
+        """
+        Args:
+            session (requests.Session): Dedicated pooled session (see ShopifyClientRegistry),
+                defaults to the session shared by the process
+            validator_cache (ValidatorCache): Dedicated conditional-GET cache, defaults to the shared one
+        """
         self.base_url = None
         self.access_token = None
         self.headers = None
+        self._client_session = session
+        if validator_cache is not None:
+            self._validator_cache = validator_cache
+        self._bind_lock = threading.Lock()
+
+    @classmethod
+    def _get_session(cls):
+        """Get or lazily create the shared, pooled HTTP session"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    pool_maxsize = DEFAULT_POOL_MAXSIZE
+                    timeout = DEFAULT_TIMEOUT
+                    try:
+                        pool_maxsize = current_app.config.get('SHOPIFY_POOL_MAXSIZE', pool_maxsize)
+                        timeout = current_app.config.get('SHOPIFY_TIMEOUT', timeout)
+                    except RuntimeError:
+                        pass  # Outside application context, keep defaults
+                    cls._session = build_session(pool_maxsize=pool_maxsize, timeout=timeout)
+        return cls._session
+
+    def _request(self, method, url, **kwargs):
+        """Send a request to Shopify through the shared keep-alive session
+
+        Calls are paced by the store's leaky-bucket limiter and 429 responses
+        are retried with backoff before being returned. Inside a
+        request_deadline() block each attempt only gets the time that is left.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute request URL
+            **kwargs: Passed through to requests (headers, params, json, timeout...)
+
+        Returns:
+            requests.Response: The raw response
+        """
+        if kwargs.get('headers') is None:
+            kwargs['headers'] = self.headers
+        limiter = get_rate_limiter(urlparse(url).netloc)
+        session = self._client_session or self._get_session()
+        timeout = kwargs.pop('timeout', None)
+
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            response = session.request(method, url, timeout=deadline_timeout(timeout), **kwargs)
+            limiter.update(response)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+            current_app.logger.warning(f"Shopify rate limit hit on {method} {url}, retrying (attempt {attempt + 1})")
+            limiter.backoff(attempt, response.headers.get('Retry-After'))
+
+    def get_rate_limit_state(self):
+        """Get the current leaky-bucket state for this service's store"""
+        self._init_config()
+        return get_rate_limiter(urlparse(self.base_url).netloc).get_state()
+
+    def _get_json(self, url, params=None):
+        """GET a JSON resource, revalidating a cached copy with If-None-Match / If-Modified-Since
+
+        A 304 answer is served from the in-memory validator cache, skipping both
+        the body download and the JSON parse. The returned body may be shared
+        with other callers and must not be mutated.
+
+        Returns:
+            tuple: (response, parsed body or None for error responses)
+        """
+        key = self._validator_cache.make_key(url, params)
+        headers = {**self.headers, **self._validator_cache.conditional_headers(key)}
+        response = self._request('GET', url, headers=headers, params=params)
+
+        if response.status_code == 304:
+            body = self._validator_cache.revalidated(key)
+            if body is not None:
+                return response, body
+            # Evicted between the request and the answer, ask again unconditionally
+            response = self._request('GET', url, params=params)
+
+        if not response.ok:
+            return response, None
+
+        self._validator_cache.record_miss()
+        body = response.json()
+        self._validator_cache.store(key, response, body)
+        return response, body
+
+    def get_cache_stats(self):
+        """Get hit/miss statistics of the conditional-GET cache"""
+        return self._validator_cache.get_stats()
+
+    def get_pool_stats(self):
+        """Get connection reuse statistics for this service's session"""
+        return get_pool_stats(self._client_session or self._get_session())
+
+    def close(self):
+        """Close a dedicated session; the shared session is left open"""
+        if self._client_session is not None:
+            self._client_session.close()
     
     def initialize(self, store_url, access_token):
-        """Initialize service with store URL and access token"""
-        self.base_url = f"https://{store_url}/admin/api/2024-01"
-        self.access_token = access_token
-        self.headers = {
+        """Bind the service to a store URL and access token
+
+        A service is bound once; serve other stores with their own instance
+        (see ShopifyClientRegistry) so concurrent requests never share headers.
+        """
+        base_url = f"https://{store_url}/admin/api/2024-01"
+        headers = {
             'X-Shopify-Access-Token': access_token,
             'Content-Type': 'application/json'
         }
+        with self._bind_lock:
+            if self.base_url is not None:
+                if (self.base_url, self.access_token) == (base_url, access_token):
+                    return
+                raise ValueError("ShopifyService is already bound to a store, use a separate client per store")
+            self.headers = headers
+            self.access_token = access_token
+            self.base_url = base_url
 
     def _init_config(self):
         """Initialize configuration from Flask config"""
@@ -49,78 +209,559 @@ class ShopifyService:
         self._init_config()
         
         try:
-            response = requests.get(
-                f"{self.base_url}/products/{product_id}.json",
-                headers=self.headers
-            )
+            response, data = self._get_json(f"{self.base_url}/products/{product_id}.json")
             
             if response.status_code == 404:
                 return None
             
             response.raise_for_status()
-            return response.json().get('product', {})
+            return data.get('product', {})
             
         except Exception as e:
             current_app.logger.error(f"Error getting product {product_id}: {str(e)}")
             raise ValueError(f"Failed to get product: {str(e)}")
     
+    def _iter_pages(self, url, key, params=None):
+        """Follow Shopify's Link rel="next" cursor and yield one page of records at a time
+
+        Args:
+            url (str): Absolute URL of the first page
+            key (str): Top-level key holding the records (e.g. 'products')
+            params (dict): Query parameters for the first page
+
+        Yields:
+            list: Records of a single page
+        """
+        fields = (params or {}).get('fields')
+        while url:
+            response = self._request('GET', url, params=params)
+            response.raise_for_status()
+            yield response.json().get(key, [])
+
+            url = response.links.get('next', {}).get('url')
+            # The next link already carries page_info and limit; Shopify rejects
+            # any other filter alongside page_info, except fields
+            params = {'fields': fields} if fields and url and 'fields=' not in url else None
+
+    def iter_product_pages(self, page_size=250, fields=None, **filters):
+        """Stream the catalog one normalized page at a time
+
+        Args:
+            page_size (int): Products per request (Shopify allows at most 250)
+            fields (str|list): Optional field projection, e.g. 'id,title,variants'
+            **filters: Extra products.json filters for the first page (status, updated_at_min, ...)
+
+        Yields:
+            list: Normalized products of a single page
+        """
+        self._init_config()
+
+        params = {'limit': min(int(page_size), 250), **filters}
+        if fields:
+            params['fields'] = ','.join(fields) if isinstance(fields, (list, tuple)) else fields
+
+        for page in self._iter_pages(f"{self.base_url}/products.json", 'products', params):
+            yield [self._normalize_product(product) for product in page]
+
+    def iter_products(self, page_size=250, fields=None, **filters):
+        """Stream every product in the store, following the pagination cursor
+
+        Only one page is held in memory at a time, so this is safe for very large catalogs.
+
+        Args:
+            page_size (int): Products per request (Shopify allows at most 250)
+            fields (str|list): Optional field projection
+            **filters: Extra products.json filters
+
+        Yields:
+            dict: Normalized product
+        """
+        for page in self.iter_product_pages(page_size=page_size, fields=fields, **filters):
+            yield from page
+
+    def _coalesced(self, name, fn, share=SHARE_RESULT):
+        """Run a store-wide read once for all concurrent callers (see SingleFlight)
+
+        The result may be shared with other requests and must not be mutated.
+        """
+        if not current_app.config.get('SINGLE_FLIGHT_ENABLED', True):
+            return fn()
+        flight = get_single_flight(current_app.config.get('REDIS_URL'))
+        return flight.do(f"{self._store_key()}:{name}", fn, share=share)
+
     def get_products(self):
-        """Fetch all products from Shopify store"""
+        """Fetch all products, served from the local catalog mirror when it is enabled
+
+        Reads the mirror as it is while a refresh runs (see
+        _ensure_catalog_fresh). Without the mirror, concurrent calls in this
+        process share one paginated fetch; the catalog is never sent through Redis.
+        """
+        catalog = self._catalog()
+        if catalog is None:
+            return self._coalesced('products', lambda: list(self.iter_products()), share=SHARE_LOCAL)
+
+        self._ensure_catalog_fresh()
+        return catalog.get_products(self._store_key())
+
+    def count_products(self, **filters):
+        """Count products with Shopify's count endpoint instead of downloading them
+
+        Args:
+            **filters: products/count.json filters (status, vendor, product_type, updated_at_min, ...)
+
+        Returns:
+            int: Number of matching products
+        """
         self._init_config()
-        response = requests.get(
-            f"{self.base_url}/products.json",
-            headers=self.headers
-        )
-        products = response.json().get('products', [])
-        
-        # Process each product to ensure required fields
-        for product in products:
-            # Ensure required fields have default values
-            product['handle'] = product.get('handle', self._generate_handle(product.get('title', 'untitled')))
-            product['vendor'] = product.get('vendor', '')
-            product['product_type'] = product.get('product_type', '')
-            product['status'] = product.get('status', 'active')
-            product['tags'] = product.get('tags', '')
-            product['template_suffix'] = product.get('template_suffix', '')
-            
-            # Ensure images have default values
-            product['images'] = [
-                {
-                    'src': img.get('src', ''),
-                    'alt': img.get('alt', '')
-                }
-                for img in product.get('images', [])
+        response, body = self._get_json(f"{self.base_url}/products/count.json", params=filters or None)
+        response.raise_for_status()
+        return body.get('count', 0)
+
+    def get_product_page(self, page=1, page_size=DASHBOARD_PAGE_SIZE):
+        """Get a single page of products for a grid, newest first
+
+        Served from the catalog mirror when it is enabled; otherwise only the
+        Shopify pages up to the requested one are fetched.
+
+        Returns:
+            list: Products of the page
+        """
+        page = max(int(page), 1)
+        catalog = self._catalog()
+        if catalog is not None:
+            self._ensure_catalog_fresh()
+            return catalog.get_products_page(self._store_key(), page_size, (page - 1) * page_size)
+
+        for number, products in enumerate(self.iter_product_pages(page_size=page_size), start=1):
+            if number == page:
+                return products
+        return []
+
+    def list_products(self, limit=50, cursor=None, sort='id', order='desc', fields=None, **filters):
+        """Get one page of products with filters, sorting and cursor pagination
+
+        Served from the indexed catalog mirror. With the mirror disabled the
+        catalog is streamed from Shopify and filtered here, which is correct but
+        scans every product.
+
+        Args:
+            limit (int): Products per page (1-250)
+            cursor (str): next_cursor of the previous page
+            sort (str): id, title, created_at or updated_at
+            order (str): 'asc' or 'desc'
+            fields (tuple): Optional top-level fields to keep in each product
+            **filters: status, vendor, product_type and title_prefix
+
+        Returns:
+            tuple: (products, next_cursor or None)
+        """
+        limit = min(max(int(limit), 1), 250)
+        catalog = self._catalog()
+        if catalog is not None:
+            self._ensure_catalog_fresh()
+            products, next_cursor = catalog.query_products(self._store_key(), limit, cursor, sort, order, **filters)
+        else:
+            products, next_cursor = self._list_products_live(limit, cursor, sort, order, **filters)
+
+        if fields:
+            products = [{field: product.get(field) for field in fields} for product in products]
+        return products, next_cursor
+
+    def _list_products_live(self, limit, cursor, sort, order, status=None, vendor=None, product_type=None, title_prefix=None):
+        """Filter, sort and page the catalog in memory, for when there is no mirror"""
+        if sort not in PRODUCT_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort}', use one of: {', '.join(PRODUCT_SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+
+        upstream_filters = {name: value for name, value in (('status', status), ('vendor', vendor), ('product_type', product_type)) if value}
+        prefix = (title_prefix or '').lower()
+
+        def sort_key(product):
+            value = product.get(sort)
+            if sort == 'id':
+                value = int(value)
+            elif value is None:
+                value = ''
+            return (value.lower() if sort == 'title' else value, int(product['id']))
+
+        products = [
+            product for product in self.iter_products(**upstream_filters)
+            if (product.get('title') or '').lower().startswith(prefix)
+        ]
+        products.sort(key=sort_key, reverse=order == 'desc')
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            after = sort_key({sort: value, 'id': last_id})
+            products = [
+                product for product in products
+                if (sort_key(product) < after if order == 'desc' else sort_key(product) > after)
             ]
-            
-            # Ensure variants have required fields
-            for variant in product.get('variants', []):
-                variant['title'] = variant.get('title', '')
-                variant['price'] = float(variant.get('price', 0))
-                variant['inventory_quantity'] = int(variant.get('inventory_quantity', 0))
-                variant['sku'] = variant.get('sku', '')
-                variant['barcode'] = variant.get('barcode', '')
-                variant['weight'] = float(variant.get('weight', 0))
-                variant['weight_unit'] = variant.get('weight_unit', 'g')
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = encode_cursor([products[-1].get(sort), int(products[-1]['id'])])
+        return products, next_cursor
+
+    def register_webhooks(self, address, topics=None):
+        """Subscribe the store to the webhooks that keep local caches fresh
+
+        Topics that are already subscribed for the address are left alone.
+
+        Args:
+            address (str): Public URL of /webhooks/shopify
+            topics (iterable): Topics to subscribe, defaults to WEBHOOK_TOPICS
+
+        Returns:
+            list: Newly subscribed topics
+        """
+        from services.webhook_service import WEBHOOK_TOPICS
+        self._init_config()
+
+        response = self._request('GET', f"{self.base_url}/webhooks.json", params={'address': address})
+        response.raise_for_status()
+        existing = {webhook['topic'] for webhook in response.json().get('webhooks', [])}
+
+        created = []
+        for topic in topics or WEBHOOK_TOPICS:
+            if topic in existing:
+                continue
+            response = self._request(
+                'POST',
+                f"{self.base_url}/webhooks.json",
+                json={'webhook': {'topic': topic, 'address': address, 'format': 'json'}}
+            )
+            if not response.ok:
+                raise ValueError(f"Failed to subscribe to {topic}: {response.text}")
+            created.append(topic)
+        return created
+
+    def get_store_stats(self):
+        """Dashboard totals without downloading the catalog
+
+        Product totals come from products/count.json. Average price and inventory
+        value are aggregated inside the local catalog mirror, or from a
+        variants-only projection of the catalog when the mirror is disabled.
+
+        Returns:
+            dict: total_products, total_themes, active_theme, avg_price and inventory_value
+        """
+        themes = self.get_themes()
+        active_theme = next((theme for theme in themes if theme.get('role') == 'main'), None)
+
+        catalog = self._catalog()
+        if catalog is not None:
+            self._ensure_catalog_fresh()
+            variant_stats = catalog.get_variant_stats(self._store_key())
+            priced_variants = variant_stats['priced_variants']
+            avg_price = variant_stats['total_price'] / priced_variants if priced_variants else 0
+            inventory_value = variant_stats['inventory_value']
+        else:
+            frame = CatalogFrame(list(self.iter_products(fields='id,variants')))
+            avg_price = frame.price_stats(priced_only=True)['avg']
+            inventory_value = frame.priced_inventory_value()
+
+        return {
+            'total_products': self.count_products(),
+            'total_themes': len(themes),
+            'active_theme': active_theme,
+            'avg_price': avg_price,
+            'inventory_value': inventory_value
+        }
+
+    def stream_products(self):
+        """Stream all products without holding the catalog in memory
+
+        Reads the local catalog mirror row by row when it is enabled, otherwise
+        follows the Shopify pagination cursor.
+
+        Yields:
+            dict: Normalized product data
+        """
+        catalog = self._catalog()
+        if catalog is None:
+            yield from self.iter_products()
+            return
+
+        self._ensure_catalog_fresh()
+        yield from catalog.iter_products(self._store_key())
+
+    def _catalog(self):
+        """Get the local catalog mirror, or None when it is disabled"""
+        self._init_config()
+        if not current_app.config.get('CATALOG_MIRROR_ENABLED', True):
+            return None
+        return get_catalog_store(current_app.config.get('CATALOG_DB_PATH'))
+
+    def _ensure_catalog_fresh(self):
+        """Sync the catalog mirror if the last sync is older than CATALOG_SYNC_INTERVAL
+
+        Only one sync per store runs at a time, in this worker (a per-store lock)
+        and across workers (a SHARE_LOCK single flight). Until the mirror has been
+        filled callers wait for that first sync; after that a stale mirror is
+        refreshed in the background, including the periodic reconcile, and
+        callers read the current copy meanwhile.
+        """
+        store = self._store_key()
+        state = self._catalog().get_sync_state(store)
+        if not self._catalog_stale(state):
+            return
+
+        lock = self._catalog_sync_lock(store)
+        if state is None:
+            with lock:
+                self._coalesced('catalog-sync', self._sync_catalog_if_stale, share=SHARE_LOCK)
+            return
+
+        if not lock.acquire(blocking=False):
+            return  # Already being refreshed
+        try:
+            _sync_executor.submit(self._sync_catalog_in_background, current_app._get_current_object(), lock)
+        except Exception:
+            lock.release()
+            raise
+
+    def _catalog_stale(self, state):
+        interval = current_app.config.get('CATALOG_SYNC_INTERVAL', CATALOG_SYNC_INTERVAL)
+        return not state or time.time() - (state['last_sync'] or 0) >= interval
+
+    @classmethod
+    def _catalog_sync_lock(cls, store):
+        with cls._catalog_sync_locks_lock:
+            return cls._catalog_sync_locks.setdefault(store, threading.Lock())
+
+    def _sync_catalog_if_stale(self):
+        """Sync unless another thread or worker did while this one waited for it"""
+        if self._catalog_stale(self._catalog().get_sync_state(self._store_key())):
+            self.sync_catalog()
+
+    def _sync_catalog_in_background(self, app, lock):
+        """Refresh the mirror on a worker thread, then release the store's sync lock"""
+        with app.app_context():
+            try:
+                self._coalesced('catalog-sync', self._sync_catalog_if_stale, share=SHARE_LOCK)
+            except Exception as e:
+                # A stale mirror is better than no dashboard
+                app.logger.warning(f"Catalog sync failed, serving mirrored products: {str(e)}")
+            finally:
+                lock.release()
+
+    def sync_catalog(self, full=False):
+        """Bring the local catalog mirror up to date with Shopify
+
+        The first sync (or full=True) downloads the whole catalog. Later syncs only
+        fetch products changed since the stored updated_at watermark, plus a
+        periodic id-only pass that removes products deleted in Shopify.
+
+        Args:
+            full (bool): Force a full download
+
+        Returns:
+            dict: Sync mode and the number of products written and removed
+        """
+        catalog = self._catalog()
+        if catalog is None:
+            raise ValueError("Catalog mirror is disabled")
+
+        store = self._store_key()
+        state = catalog.get_sync_state(store)
+        full = full or state is None
+        filters = {}
+        if not full and state.get('watermark'):
+            filters['updated_at_min'] = state['watermark']
+
+        watermark = None
+        written = 0
+        seen_ids = []
+        for page in self.iter_product_pages(**filters):
+            page_watermark = catalog.upsert_products(store, page)
+            watermark = max(filter(None, [watermark, page_watermark]), default=None)
+            written += len(page)
+            if full:
+                seen_ids.extend(product['id'] for product in page)
+
+        reconcile_interval = current_app.config.get('CATALOG_RECONCILE_INTERVAL', CATALOG_RECONCILE_INTERVAL)
+        reconcile = full or time.time() - (state.get('last_reconcile') or 0) >= reconcile_interval
+        removed = 0
+        if reconcile:
+            if not full:
+                seen_ids = [product['id'] for page in self.iter_product_pages(fields='id') for product in page]
+            removed = catalog.retain_products(store, seen_ids)
+
+        catalog.set_sync_state(store, watermark, reconciled=reconcile)
+        current_app.logger.info(f"Catalog sync for {store}: {'full' if full else 'incremental'}, {written} written, {removed} removed")
+        return {
+            'mode': 'full' if full else 'incremental',
+            'written': written,
+            'removed': removed,
+            'reconciled': reconcile
+        }
+
+    def get_catalog_fingerprint(self):
+        """Short string that changes whenever the store's catalog changes
+
+        Built from the mirrored product count and greatest updated_at, after the
+        usual throttled sync. Returns None when the catalog mirror is disabled.
+        """
+        catalog = self._catalog()
+        if catalog is None:
+            return None
+        self._ensure_catalog_fresh()
+        count, updated_at = catalog.get_fingerprint(self._store_key())
+        return f"{count}-{updated_at or '0'}"
+
+    def _mirror_products(self, products):
+        """Write products returned by a Shopify write into the catalog mirror"""
+        try:
+            catalog = self._catalog()
+            if catalog is not None:
+                catalog.upsert_products(self._store_key(), [self._normalize_product(copy.deepcopy(p)) for p in products if p])
+        except Exception as e:
+            current_app.logger.warning(f"Failed to update catalog mirror: {str(e)}")
+
+    def _mirror_delete(self, product_ids):
+        """Remove deleted products from the catalog mirror"""
+        try:
+            catalog = self._catalog()
+            if catalog is not None:
+                catalog.delete_products(self._store_key(), product_ids)
+        except Exception as e:
+            current_app.logger.warning(f"Failed to update catalog mirror: {str(e)}")
+
+    def _normalize_product(self, product):
+        """Ensure a product returned by Shopify has all the fields the app relies on"""
+        # Ensure required fields have default values
+        if 'handle' not in product:
+            product['handle'] = self._generate_handle(product.get('title', 'untitled'))
+        product['vendor'] = product.get('vendor', '')
+        product['product_type'] = product.get('product_type', '')
+        product['status'] = product.get('status', 'active')
+        product['tags'] = product.get('tags', '')
+        product['template_suffix'] = product.get('template_suffix', '')
         
-        return products
+        # Ensure images have default values
+        product['images'] = [
+            {
+                'src': img.get('src', ''),
+                'alt': img.get('alt', '')
+            }
+            for img in product.get('images', [])
+        ]
+        
+        # Ensure variants have required fields
+        for variant in product.get('variants', []):
+            variant['title'] = variant.get('title', '')
+            variant['price'] = float(variant.get('price', 0))
+            variant['inventory_quantity'] = int(variant.get('inventory_quantity', 0))
+            variant['sku'] = variant.get('sku', '')
+            variant['barcode'] = variant.get('barcode', '')
+            variant['weight'] = float(variant.get('weight', 0))
+            variant['weight_unit'] = variant.get('weight_unit', 'g')
+        
+        return product
     
+    def verify_access(self):
+        """Check the bound token with a direct themes.json call
+
+        Bypasses the conditional-GET cache and the single flight, whose shared
+        results could vouch for a token Shopify would reject.
+
+        Returns:
+            bool: Whether Shopify accepted the token and returned the store's themes
+        """
+        self._init_config()
+        response = self._request('GET', f"{self.base_url}/themes.json", params={'fields': 'id'})
+        return response.ok and bool(response.json().get('themes'))
+
     def get_themes(self):
-        """Fetch all themes from Shopify store"""
+        """Fetch all themes from Shopify store, sharing one call between concurrent callers"""
+        self._init_config()
+        data = self._coalesced('themes', lambda: self._get_json(f"{self.base_url}/themes.json")[1])
+        themes = (data or {}).get('themes', [])
+        if data is not None:
+            self._cache_active_theme(next((theme for theme in themes if theme.get('role') == 'main'), None))
+        return themes
+
+    def _store_key(self):
+        """Key identifying the connected store in per-store caches"""
+        return urlparse(self.base_url).netloc
+
+    def _cache_active_theme(self, theme):
+        """Remember the store's main theme, noting when a different one got published"""
+        self.remember_active_theme(self._store_key(), theme)
+
+    @classmethod
+    def remember_active_theme(cls, store, theme):
+        """Set (or, with theme=None, drop) the cached main theme of a store"""
+        with cls._active_themes_lock:
+            cached = cls._active_themes.get(store)
+            if cached and cached[0] and theme and cached[0].get('id') != theme.get('id'):
+                current_app.logger.info(f"Theme publish detected on {store}: {cached[0].get('id')} -> {theme.get('id')}")
+            if theme:
+                cls._active_themes[store] = (theme, time.monotonic() + ACTIVE_THEME_TTL)
+            else:
+                cls._active_themes.pop(store, None)
+
+    def invalidate_active_theme(self):
+        """Drop the cached main theme so the next lookup asks Shopify again"""
         self._init_config()
-        response = requests.get(
-            f"{self.base_url}/themes.json",
-            headers=self.headers
-        )
-        return response.json().get('themes', [])
+        with self._active_themes_lock:
+            self._active_themes.pop(self._store_key(), None)
+
+    def get_active_theme(self, force_refresh=False):
+        """Get the store's main theme, cached per store for ACTIVE_THEME_TTL seconds
+
+        Args:
+            force_refresh (bool): Bypass the cache and re-read themes.json
+
+        Returns:
+            dict: The main theme, or None if the store has none
+        """
+        self._init_config()
+
+        if not force_refresh:
+            cached = self._active_themes.get(self._store_key())
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+        themes = self.get_themes()
+        return next((theme for theme in themes if theme.get('role') == 'main'), None)
+
+    def _theme_asset_request(self, method, params=None, payload=None):
+        """Send an assets.json request to the active theme
+
+        A 404 on a PUT can only mean the cached theme is gone (unpublished or
+        deleted), so the theme is re-resolved once and, if another theme is now
+        live, the write is retried there. On GET and DELETE a 404 just means the
+        asset doesn't exist and is returned as is.
+
+        Returns:
+            tuple: (response, theme), or (None, None) if there is no active theme
+        """
+        active_theme = self.get_active_theme()
+        for attempt in range(2):
+            if not active_theme:
+                return None, None
+            response = self._request(
+                method,
+                f"{self.base_url}/themes/{active_theme['id']}/assets.json",
+                headers=self.headers,
+                params=params,
+                json=payload
+            )
+            if response.status_code != 404 or attempt or method != 'PUT':
+                return response, active_theme
+            refreshed = self.get_active_theme(force_refresh=True)
+            if refreshed and refreshed.get('id') == active_theme['id']:
+                return response, active_theme
+            active_theme = refreshed
     
     def get_theme_assets(self, theme_id):
         """Fetch all assets for a specific theme"""
         self._init_config()
-        response = requests.get(
-            f"{self.base_url}/themes/{theme_id}/assets.json",
-            headers=self.headers
-        )
-        return response.json().get('assets', [])
+        response, data = self._get_json(f"{self.base_url}/themes/{theme_id}/assets.json")
+        return (data or {}).get('assets', [])
 
     def create_product(self, title, language='en', price=None, url=None, template_suffix=None, images=None):
         """Create a new product in Shopify store
@@ -205,7 +846,8 @@ class ShopifyService:
 
             # Create the product
             current_app.logger.info("Sending create product request to Shopify")
-            response = requests.post(
+            response = self._request(
+                'POST',
                 f"{self.base_url}/products.json",
                 headers=self.headers,
                 json=product_data
@@ -229,6 +871,7 @@ class ShopifyService:
             response.raise_for_status()
             product = response.json().get('product', {})
             current_app.logger.info(f"Product created successfully with ID: {product.get('id')}")
+            self._mirror_products([product])
             return product
             
         except requests.exceptions.RequestException as e:
@@ -244,7 +887,7 @@ class ShopifyService:
     def _make_request(self, method, endpoint, data=None, files=None):
         """Make a request to the Shopify API"""
         try:
-            self._ensure_initialized()
+            self._init_config()
             
             headers = {
                 'X-Shopify-Access-Token': self.access_token,
@@ -256,20 +899,20 @@ class ShopifyService:
             if files:
                 del headers['Content-Type']
             
-            response = requests.request(
-                method=method,
-                url=url,
+            response = self._request(
+                method,
+                url,
                 headers=headers,
                 data=json.dumps(data) if data and not files else data,
                 files=files
             )
             
             if response.status_code == 401:
-                raise ValueError("Invalid Shopify access token. Please check your SHOPIFY_ACCESS_TOKEN configuration.") from e
+                raise ValueError("Invalid Shopify access token. Please check your SHOPIFY_ACCESS_TOKEN configuration.")
             elif response.status_code == 404:
-                raise ValueError(f"Resource not found at endpoint: {endpoint}") from e
+                raise ValueError(f"Resource not found at endpoint: {endpoint}")
             elif response.status_code == 422:
-                raise ValueError(f"Invalid product data: {response.text}") from e
+                raise ValueError(f"Invalid product data: {response.text}")
             
             response.raise_for_status()
             return response.json() if response.content else None
@@ -283,78 +926,53 @@ class ShopifyService:
             raise ValueError(f"Error communicating with Shopify API: {str(e)}") from e 
 
     def delete_product(self, product_id):
-        """Delete a product, its associated template, and all media (images, gifs) from the store
+        """Delete a product and its associated template from the store
+
+        Images and variants are removed by Shopify together with the product, so
+        they are not deleted one by one.
         
         Args:
             product_id (str): The ID of the product to delete
             
         Returns:
-            bool: True if deletion was successful
+            bool: True if deletion was successful, None if the product doesn't exist
         """
         self._init_config()
         
         try:
-            # First get the product to check for template_suffix and media
-            product_response = requests.get(
+            # Only the template suffix is needed to clean up after the product
+            product_response = self._request(
+                'GET',
                 f"{self.base_url}/products/{product_id}.json",
-                headers=self.headers
+                params={'fields': 'id,template_suffix'}
             )
-            product = product_response.json().get('product', {})
-            template_suffix = product.get('template_suffix')
+            if product_response.status_code == 404:
+                return None
+            product_response.raise_for_status()
+            template_suffix = product_response.json().get('product', {}).get('template_suffix')
             
-            # Delete all media (images, gifs) associated with the product
-            if 'images' in product:
-                current_app.logger.info(f"Deleting {len(product['images'])} media files...")
-                for image in product['images']:
-                    try:
-                        # Delete each image using its ID
-                        image_id = image['id']
-                        response = requests.delete(
-                            f"{self.base_url}/products/{product_id}/images/{image_id}.json",
-                            headers=self.headers
-                        )
-                        if response.status_code == 200:
-                            current_app.logger.info(f"Successfully deleted image {image_id}")
-                        else:
-                            current_app.logger.warning(f"Failed to delete image {image_id}: {response.text}")
-                    except Exception as img_error:
-                        current_app.logger.error(f"Error deleting image {image_id}: {str(img_error)}")
+            response = self._request('DELETE', f"{self.base_url}/products/{product_id}.json")
+            if response.status_code != 200:
+                current_app.logger.error(f"Failed to delete product {product_id}: {response.text}")
+                return False
+            current_app.logger.info(f"Successfully deleted product {product_id}")
+            self._mirror_delete([product_id])
             
-            # If product has a template, delete it
+            # Then drop its template from the active theme
             if template_suffix:
-                # Get active theme ID
-                themes_response = requests.get(
-                    f"{self.base_url}/themes.json",
-                    headers=self.headers
+                asset_key = f'templates/product.{template_suffix}.json'
+                template_response, active_theme = self._theme_asset_request(
+                    'DELETE',
+                    params={'asset[key]': asset_key}
                 )
-                themes = themes_response.json().get('themes', [])
-                active_theme = next((theme for theme in themes if theme['role'] == 'main'), None)
                 
-                if active_theme:
-                    # Delete the template asset
-                    asset_key = f'templates/product.{template_suffix}.json'
-                    template_response = requests.delete(
-                        f"{self.base_url}/themes/{active_theme['id']}/assets.json?asset[key]={asset_key}",
-                        headers=self.headers
-                    )
+                if template_response is not None:
                     if template_response.status_code == 200:
                         current_app.logger.info(f"Successfully deleted template {asset_key}")
                     else:
                         current_app.logger.warning(f"Failed to delete template {asset_key}: {template_response.text}")
             
-            # Finally delete the product
-            response = requests.delete(
-                f"{self.base_url}/products/{product_id}.json",
-                headers=self.headers
-            )
-            
-            success = response.status_code == 200
-            if success:
-                current_app.logger.info(f"Successfully deleted product {product_id}")
-            else:
-                current_app.logger.error(f"Failed to delete product {product_id}: {response.text}")
-            
-            return success
+            return True
             
         except Exception as e:
             current_app.logger.error(f"Error deleting product: {str(e)}")
@@ -363,6 +981,10 @@ class ShopifyService:
     def duplicate_product(self, product_id):
         """Duplicate an existing product
         
+        The copy is created with its new template suffix while the original
+        template is read, then the template copy is written; the product is not
+        updated afterwards unless copying the template failed.
+        
         Args:
             product_id (str): The ID of the product to duplicate
             
@@ -372,16 +994,14 @@ class ShopifyService:
         self._init_config()
         
         try:
-            # Get the original product
-            url = f"{self.base_url}/products/{product_id}.json"
-            response = requests.get(
-                url,
-                headers=self.headers
-            )
-            if response.status_code != 200:
+            # Get the original product (revalidated, so usually a 304)
+            response, original = self._get_json(f"{self.base_url}/products/{product_id}.json")
+            if original is None:
                 raise Exception("Failed to get original product")
             
-            product_data = response.json()["product"]
+            product_data = original["product"]
+            template_suffix = product_data.get('template_suffix')
+            new_suffix = ''.join(random.choices(string.digits, k=10)) if template_suffix else None
             
             # Create new product data with modified title
             new_product = {
@@ -394,84 +1014,61 @@ class ShopifyService:
                     "variants": product_data['variants'],
                     "options": product_data['options'],
                     "tags": product_data.get('tags', ''),
-                    "template_suffix": product_data.get('template_suffix'),
+                    "template_suffix": new_suffix,
                     "images": product_data.get('images', [])
                 }
             }
             
-            # Create the duplicate
-            create_url = f"{self.base_url}/products.json"
-            create_response = requests.post(
-                create_url,
-                headers=self.headers,
-                json=new_product
-            )
+            # Create the duplicate while the original template is read
+            app = current_app._get_current_object()
+            
+            def create():
+                with app.app_context():
+                    return self._request('POST', f"{self.base_url}/products.json", json=new_product)
+            
+            create_future = _write_executor.submit(create)
+            template_response = None
+            if template_suffix:
+                try:
+                    template_response, active_theme = self._theme_asset_request(
+                        'GET',
+                        params={'asset[key]': f'templates/product.{template_suffix}.json'}
+                    )
+                except Exception as template_error:
+                    current_app.logger.error(f"Error reading template to duplicate: {str(template_error)}")
+            
+            create_response = create_future.result()
             if create_response.status_code != 201:
                 raise Exception("Failed to create duplicate product")
+            duplicate = create_response.json()["product"]
             
-            # If original product has a template, duplicate it
-            template_suffix = product_data.get('template_suffix')
             if template_suffix:
+                copied = False
                 try:
-                    # Get active theme ID
-                    themes_response = requests.get(
-                        f"{self.base_url}/themes.json",
-                        headers=self.headers
-                    )
-                    themes = themes_response.json().get('themes', [])
-                    active_theme = next((theme for theme in themes if theme['role'] == 'main'), None)
-                    
-                    if active_theme:
-                        # Get original template
-                        original_asset_key = f'templates/product.{template_suffix}.json'
-                        template_response = requests.get(
-                            f"{self.base_url}/themes/{active_theme['id']}/assets.json?asset[key]={original_asset_key}",
-                            headers=self.headers
-                        )
-                        
-                        if template_response.status_code == 200:
-                            template_data = template_response.json()['asset']['value']
-                            
-                            # Generate new template suffix
-                            import random
-                            import string
-                            new_suffix = ''.join(random.choices(string.digits, k=10))
-                            
-                            # Create new template asset
-                            new_asset_key = f'templates/product.{new_suffix}.json'
-                            asset_data = {
-                                'asset': {
-                                    'key': new_asset_key,
-                                    'value': template_data
-                                }
+                    if template_response is not None and template_response.status_code == 200:
+                        asset_data = {
+                            'asset': {
+                                'key': f'templates/product.{new_suffix}.json',
+                                'value': template_response.json()['asset']['value']
                             }
-                            
-                            # Create the new template
-                            requests.put(
-                                f"{self.base_url}/themes/{active_theme['id']}/assets.json",
-                                headers=self.headers,
-                                json=asset_data
-                            )
-                            
-                            # Update the new product with the new template suffix
-                            new_product_id = create_response.json()["product"]["id"]
-                            update_response = requests.put(
-                                f"{self.base_url}/products/{new_product_id}.json",
-                                headers=self.headers,
-                                json={
-                                    "product": {
-                                        "id": new_product_id,
-                                        "template_suffix": new_suffix
-                                    }
-                                }
-                            )
-                            if update_response.status_code == 200:
-                                return update_response.json()["product"]
+                        }
+                        put_response, active_theme = self._theme_asset_request('PUT', payload=asset_data)
+                        copied = put_response is not None and put_response.status_code == 200
                 except Exception as template_error:
                     current_app.logger.error(f"Error duplicating template: {str(template_error)}")
-                    # Continue with the product duplication even if template duplication fails
+                
+                if not copied:
+                    # Point the copy at the original template instead of a missing one
+                    update_response = self._request(
+                        'PUT',
+                        f"{self.base_url}/products/{duplicate['id']}.json",
+                        json={"product": {"id": duplicate['id'], "template_suffix": template_suffix}}
+                    )
+                    if update_response.status_code == 200:
+                        duplicate = update_response.json()["product"]
             
-            return create_response.json()["product"]
+            self._mirror_products([duplicate])
+            return duplicate
             
         except Exception as e:
             current_app.logger.error(f"Error duplicating product: {str(e)}")
@@ -487,18 +1084,7 @@ class ShopifyService:
         self._init_config()
         
         try:
-            # Get active theme ID
-            themes_response = requests.get(
-                f"{self.base_url}/themes.json",
-                headers=self.headers
-            )
-            themes = themes_response.json().get('themes', [])
-            active_theme = next((theme for theme in themes if theme['role'] == 'main'), None)
-            
-            if not active_theme:
-                raise Exception('No active theme found')
-            
-            # Create the asset
+            # Create the asset in the (cached) active theme
             asset_data = {
                 'asset': {
                     'key': key,
@@ -506,11 +1092,10 @@ class ShopifyService:
                 }
             }
             
-            response = requests.put(
-                f"{self.base_url}/themes/{active_theme['id']}/assets.json",
-                headers=self.headers,
-                json=asset_data
-            )
+            response, active_theme = self._theme_asset_request('PUT', payload=asset_data)
+            
+            if not active_theme:
+                raise Exception('No active theme found')
             
             if response.status_code != 200:
                 raise Exception(f'Failed to create asset: {response.text}')
@@ -524,229 +1109,52 @@ class ShopifyService:
     def update_product(self, product_id, data):
         """Update a product's properties in Shopify store
         
+        Only the given fields are sent; Shopify leaves every other field as it
+        is, so the product is not read first.
+        
         Args:
             product_id (str): The ID of the product to update
-            data (dict): The data to update (e.g., template_suffix)
+            data (dict): The fields to change (e.g., template_suffix)
             
         Returns:
-            bool: True if update was successful
+            dict: The updated product as returned by Shopify, or False if the update failed
         """
         self._init_config()
         
         try:
-            current_app.logger.info(f"Updating product {product_id} with data: {json.dumps(data)}")
+            changes = {k: v for k, v in data.items() if k not in READ_ONLY_PRODUCT_FIELDS}
+            current_app.logger.info(f"Updating product {product_id} with data: {json.dumps(changes)}")
             
-            # Get current product data
-            product_response = requests.get(
+            response = self._request(
+                'PUT',
                 f"{self.base_url}/products/{product_id}.json",
-                headers=self.headers
-            )
-            if product_response.status_code != 200:
-                raise Exception("Failed to get product data")
-            
-            current_product = product_response.json()['product']
-            
-            # Update only the provided fields
-            update_data = {
-                "product": {
-                    **{k: current_product[k] for k in current_product if k != 'admin_graphql_api_id'},
-                    **data
-                }
-            }
-            
-            # Send update request
-            response = requests.put(
-                f"{self.base_url}/products/{product_id}.json",
-                headers=self.headers,
-                json=update_data
+                json={"product": {"id": product_id, **changes}}
             )
             
             if response.status_code != 200:
                 current_app.logger.error(f"Failed to update product: {response.text}")
                 return False
                 
-            return True
+            product = response.json().get('product')
+            self._mirror_products([product])
+            return product
             
         except Exception as e:
             current_app.logger.error(f"Error updating product: {str(e)}")
             return False 
 
-    def get_analytics_data(self, time_range='30d'):
-        """Get analytics data using available scopes (read_analytics, read_products, read_themes)"""
-        self._init_config()
-        
-        # Calculate date range
-        end_date = datetime.now()
-        if time_range == '7d':
-            start_date = end_date - timedelta(days=7)
-        elif time_range == '30d':
-            start_date = end_date - timedelta(days=30)
-        elif time_range == '90d':
-            start_date = end_date - timedelta(days=90)
-        elif time_range == '1y':
-            start_date = end_date - timedelta(days=365)
-        else:
-            start_date = end_date - timedelta(days=30)  # Default to 30 days
-            
-        try:
-            # Get products data
-            products = self.get_products()
-            themes = self.get_themes()
-            
-            # Get analytics reports
-            reports = self._get_analytics_reports(start_date, end_date)
-            
-            # Calculate product statistics
-            total_products = len(products)
-            active_products = len([p for p in products if p.get('status') == 'active'])
-            total_variants = sum(len(p.get('variants', [])) for p in products)
-            
-            # Calculate inventory and pricing metrics
-            total_inventory = 0
-            total_value = 0
-            prices = []
-            inventory_by_date = {}
-            product_types = {}
-            vendors = {}
-            
-            for product in products:
-                # Track product types
-                product_type = product.get('product_type', 'Uncategorized')
-                if product_type not in product_types:
-                    product_types[product_type] = 0
-                product_types[product_type] += 1
-                
-                # Track vendors
-                vendor = product.get('vendor', 'Unknown')
-                if vendor not in vendors:
-                    vendors[vendor] = 0
-                vendors[vendor] += 1
-                
-                for variant in product.get('variants', []):
-                    price = float(variant.get('price', 0))
-                    inventory = int(variant.get('inventory_quantity', 0))
-                    total_inventory += inventory
-                    total_value += price * inventory
-                    prices.append(price)
-                    
-                    # Track inventory changes by date
-                    updated_at = variant.get('updated_at', '').split('T')[0]
-                    if updated_at:
-                        if updated_at not in inventory_by_date:
-                            inventory_by_date[updated_at] = {'count': 0, 'value': 0}
-                        inventory_by_date[updated_at]['count'] += inventory
-                        inventory_by_date[updated_at]['value'] += price * inventory
-            
-            # Calculate price statistics
-            avg_price = sum(prices) / len(prices) if prices else 0
-            min_price = min(prices) if prices else 0
-            max_price = max(prices) if prices else 0
-            
-            # Get theme statistics
-            total_themes = len(themes)
-            active_theme = next((theme for theme in themes if theme.get('role') == 'main'), None)
-            
-            # Prepare daily data for charts
-            dates = []
-            inventory_data = []
-            value_data = []
-            
-            current_date = start_date
-            while current_date <= end_date:
-                date_str = current_date.strftime('%Y-%m-%d')
-                dates.append(date_str)
-                
-                if date_str in inventory_by_date:
-                    inventory_data.append(inventory_by_date[date_str]['count'])
-                    value_data.append(inventory_by_date[date_str]['value'])
-                else:
-                    inventory_data.append(0)
-                    value_data.append(0)
-                
-                current_date += timedelta(days=1)
-            
-            # Calculate top products by inventory value
-            top_products = []
-            for product in products:
-                product_value = 0
-                total_units = 0
-                views = reports.get('product_views', {}).get(str(product['id']), 0)
-                
-                for variant in product.get('variants', []):
-                    price = float(variant.get('price', 0))
-                    inventory = int(variant.get('inventory_quantity', 0))
-                    product_value += price * inventory
-                    total_units += inventory
-                
-                top_products.append({
-                    'title': product['title'],
-                    'inventory': total_units,
-                    'value': product_value,
-                    'price_range': f"${min(float(v['price']) for v in product['variants']):.2f} - ${max(float(v['price']) for v in product['variants']):.2f}" if len(product['variants']) > 1 else f"${float(product['variants'][0]['price']):.2f}",
-                    'views': views,
-                    'type': product.get('product_type', 'Uncategorized'),
-                    'vendor': product.get('vendor', 'Unknown')
-                })
-            
-            # Sort by value and get top 10
-            top_products.sort(key=lambda x: x['value'], reverse=True)
-            top_products = top_products[:10]
-            
-            # Format currency values
-            for product in top_products:
-                product['value'] = f"{product['value']:.2f}"
-            
-            # Sort product types and vendors by count
-            product_type_data = [{'type': k, 'count': v} for k, v in product_types.items()]
-            product_type_data.sort(key=lambda x: x['count'], reverse=True)
-            
-            vendor_data = [{'name': k, 'count': v} for k, v in vendors.items()]
-            vendor_data.sort(key=lambda x: x['count'], reverse=True)
-            
-            return {
-                'total_products': total_products,
-                'active_products': active_products,
-                'total_variants': total_variants,
-                'total_inventory': total_inventory,
-                'total_value': f"{total_value:.2f}",
-                'avg_price': f"{avg_price:.2f}",
-                'min_price': f"{min_price:.2f}",
-                'max_price': f"{max_price:.2f}",
-                'total_themes': total_themes,
-                'active_theme': active_theme.get('name') if active_theme else None,
-                'dates': dates,
-                'inventory_data': inventory_data,
-                'value_data': value_data,
-                'top_products': top_products,
-                'product_types': product_type_data[:5],  # Top 5 product types
-                'vendors': vendor_data[:5],  # Top 5 vendors
-                'analytics': {
-                    'total_views': reports.get('total_views', 0),
-                    'unique_visitors': reports.get('unique_visitors', 0),
-                    'avg_session_duration': reports.get('avg_session_duration', 0),
-                    'bounce_rate': reports.get('bounce_rate', 0),
-                    'top_referrers': reports.get('top_referrers', [])[:5],  # Top 5 referrers
-                    'device_breakdown': reports.get('device_breakdown', {})
-                },
-                # Calculate trends
-                'product_trend': self._calculate_trend(total_products, total_products - len([p for p in products if p.get('created_at', '').startswith(dates[0])])),
-                'inventory_trend': self._calculate_trend(total_inventory, sum(inventory_data[:len(dates)//2]) / (len(dates)//2)),
-                'value_trend': self._calculate_trend(total_value, sum(value_data[:len(dates)//2]) / (len(dates)//2))
-            }
-            
-        except Exception as e:
-            current_app.logger.error(f"Error fetching analytics data: {str(e)}")
-            raise
-            
     def _get_analytics_reports(self, start_date, end_date):
         """Fetch analytics reports from Shopify Analytics API"""
+        self._init_config()
+        
         try:
             # Format dates for API
             start_date_str = start_date.strftime('%Y-%m-%d')
             end_date_str = end_date.strftime('%Y-%m-%d')
             
             # Get analytics reports
-            response = requests.get(
+            response = self._request(
+                'GET',
                 f"{self.base_url}/reports.json",
                 headers=self.headers,
                 params={
@@ -789,79 +1197,54 @@ class ShopifyService:
             current_app.logger.error(f"Error fetching analytics reports: {str(e)}")
             return {}
     
-    def get_orders(self, start_date=None, end_date=None, status='any'):
-        """Fetch orders from Shopify store with optional date filtering"""
+    def iter_order_pages(self, start_date=None, end_date=None, status='any', page_size=250, fields=None, **filters):
+        """Stream orders one page at a time, following the pagination cursor
+
+        Args:
+            start_date (str): Optional 'YYYY-MM-DD' lower bound on created_at
+            end_date (str): Optional 'YYYY-MM-DD' upper bound on created_at
+            status (str): Order status filter (default: 'any')
+            page_size (int): Orders per request (Shopify allows at most 250)
+            fields (str|list): Optional field projection, e.g. 'created_at,total_price'
+            **filters: Extra orders.json filters (updated_at_min, financial_status, ...)
+
+        Yields:
+            list: Orders of a single page
+        """
         self._init_config()
         
         params = {
             'status': status,
-            'limit': 250  # Maximum allowed by Shopify
+            'limit': min(int(page_size), 250),  # Maximum allowed by Shopify
+            **filters
         }
         
         if start_date:
             params['created_at_min'] = f"{start_date}T00:00:00Z"
         if end_date:
             params['created_at_max'] = f"{end_date}T23:59:59Z"
+        if fields:
+            params['fields'] = ','.join(fields) if isinstance(fields, (list, tuple)) else fields
             
         try:
-            response = requests.get(
-                f"{self.base_url}/orders.json",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json().get('orders', [])
+            yield from self._iter_pages(f"{self.base_url}/orders.json", 'orders', params)
         except Exception as e:
             current_app.logger.error(f"Error fetching orders: {str(e)}")
             raise
-    
-    def _calculate_period_metrics(self, orders):
-        """Calculate basic metrics for a set of orders"""
-        total_orders = len(orders)
-        total_sales = sum(float(order['total_price']) for order in orders)
-        avg_order_value = total_sales / total_orders if total_orders > 0 else 0
-        
-        return {
-            'total_orders': total_orders,
-            'total_sales': total_sales,
-            'avg_order_value': avg_order_value
-        }
-    
-    def _calculate_trend(self, current_value, previous_value):
-        """Calculate percentage trend between two values"""
-        if previous_value == 0:
-            return 0
-        return ((current_value - previous_value) / previous_value) * 100
-    
-    def _calculate_top_products(self, orders):
-        """Calculate top-performing products from orders"""
-        product_stats = {}
-        
-        for order in orders:
-            for item in order['line_items']:
-                product_id = item['product_id']
-                if product_id not in product_stats:
-                    product_stats[product_id] = {
-                        'title': item['title'],
-                        'orders': 0,
-                        'revenue': 0,
-                        'units_sold': 0
-                    }
-                
-                product_stats[product_id]['orders'] += 1
-                product_stats[product_id]['revenue'] += float(item['price']) * item['quantity']
-                product_stats[product_id]['units_sold'] += item['quantity']
-        
-        # Convert to list and sort by revenue
-        top_products = list(product_stats.values())
-        top_products.sort(key=lambda x: x['revenue'], reverse=True)
-        
-        # Add conversion rate (placeholder as we don't have view data)
-        for product in top_products:
-            product['conversion_rate'] = 0  # Requires additional data from Shopify Analytics API
-        
-        return top_products[:10]  # Return top 10 products 
 
+    def iter_orders(self, start_date=None, end_date=None, status='any', page_size=250, fields=None, **filters):
+        """Stream every matching order without holding more than one page in memory
+
+        Yields:
+            dict: Order data
+        """
+        for page in self.iter_order_pages(start_date, end_date, status, page_size, fields, **filters):
+            yield from page
+
+    def get_orders(self, start_date=None, end_date=None, status='any', fields=None):
+        """Fetch orders from Shopify store with optional date filtering"""
+        return list(self.iter_orders(start_date, end_date, status, fields=fields))
+    
     def _generate_handle(self, title):
         """Generate a URL-friendly handle from a title
         
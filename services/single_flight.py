@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+import uuid
+import redis
+from flask import current_app
+
+# How long a worker may hold a flight before others give up waiting on it
+DEFAULT_FLIGHT_LOCK_TTL = 30
+# How long a published result stays readable for workers still polling for it
+DEFAULT_FLIGHT_RESULT_TTL = 10
+# Delay between checks while another worker's flight is running
+FLIGHT_POLL_INTERVAL = 0.05
+KEY_PREFIX = 'generify:flight'
+
+# How a flight is shared with other workers: publish its result through Redis,
+# only hold other workers back until it finishes (they then redo the now cheap
+# work, e.g. re-read a freshly synced local mirror), or not at all
+SHARE_RESULT = 'result'
+SHARE_LOCK = 'lock'
+SHARE_LOCAL = 'local'
+
+
+class _Call:
+    """One in-flight call that concurrent callers of the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent identical reads into a single upstream call
+
+    Within a process, the first caller of a key runs the call and every thread
+    asking for the same key meanwhile waits for it and gets the same result
+    (or the same exception). With REDIS_URL set, the running thread also takes
+    a Redis lock (SET NX) naming the flight, and workers that find the lock
+    taken poll for the result it publishes instead of calling Shopify. Only
+    small results should be published (share=SHARE_RESULT); work whose output
+    lands somewhere every worker can read, like the SQLite mirror, uses
+    SHARE_LOCK so other workers just wait for it and then read locally. Results
+    are only shared with callers that arrived while the call was running, so
+    this never serves data older than the call itself. Shared results must be
+    treated as read-only; Redis results must be JSON serializable.
+    """
+
+    def __init__(self, redis_url=None, lock_ttl=DEFAULT_FLIGHT_LOCK_TTL, result_ttl=DEFAULT_FLIGHT_RESULT_TTL):
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self._redis = redis.from_url(redis_url) if redis_url else None
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+        self.remote_shared = 0
+
+    def do(self, key, fn, share=SHARE_RESULT):
+        """Run fn once for all concurrent callers of key
+
+        Args:
+            key (str): Identity of the read, e.g. "store:products"
+            fn (callable): Performs the read when no identical call is in flight
+            share (str): SHARE_RESULT, SHARE_LOCK or SHARE_LOCAL, see the class docstring
+
+        Returns:
+            The result of fn, possibly computed by another thread or worker
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, share)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _run(self, key, fn, share):
+        """Run fn, or pick up the result of the same call running in another worker"""
+        if self._redis is None or share == SHARE_LOCAL:
+            return self._call(fn)
+
+        lock_key = f"{KEY_PREFIX}:{key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            acquired = self._redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+        except redis.RedisError as e:
+            current_app.logger.warning(f"Single-flight lock unavailable, calling directly: {str(e)}")
+            return self._call(fn)
+
+        if not acquired:
+            found, result = self._wait_remote(key, lock_key, share == SHARE_RESULT)
+            if found:
+                return result
+            return self._call(fn)
+
+        try:
+            result = self._call(fn)
+            if share == SHARE_RESULT:
+                try:
+                    self._redis.setex(f"{KEY_PREFIX}:{key}:{token}", self.result_ttl, json.dumps(result, default=str))
+                except redis.RedisError as e:
+                    current_app.logger.warning(f"Single-flight result publish failed: {str(e)}")
+            return result
+        finally:
+            try:
+                # Only release our own lock; it may have expired and been retaken
+                if self._redis.get(lock_key) == token.encode():
+                    self._redis.delete(lock_key)
+            except redis.RedisError:
+                pass
+
+    def _wait_remote(self, key, lock_key, published=True):
+        """Poll for the result of another worker's flight
+
+        Args:
+            published (bool): Whether the other worker publishes its result; if
+                not, just wait for its lock to be released
+
+        Returns:
+            tuple: (found, result); found is False when the other worker finished
+            without publishing (it failed, or doesn't publish) or the lock expired
+        """
+        deadline = time.monotonic() + self.lock_ttl
+        token = None
+        try:
+            while time.monotonic() < deadline:
+                holder = self._redis.get(lock_key)
+                if holder is not None:
+                    token = holder.decode()
+                if published and token is not None:
+                    raw = self._redis.get(f"{KEY_PREFIX}:{key}:{token}")
+                    if raw is not None:
+                        with self._lock:
+                            self.remote_shared += 1
+                        return True, json.loads(raw)
+                if holder is None:
+                    return False, None
+                time.sleep(FLIGHT_POLL_INTERVAL)
+        except redis.RedisError as e:
+            current_app.logger.warning(f"Single-flight wait failed, calling directly: {str(e)}")
+        return False, None
+
+    def _call(self, fn):
+        with self._lock:
+            self.calls += 1
+        return fn()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'backend': 'redis' if self._redis is not None else 'local',
+                'in_flight': len(self._calls),
+                'calls': self.calls,
+                'shared': self.shared,
+                'remote_shared': self.remote_shared
+            }
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight(redis_url=None):
+    """Get the process-wide single-flight group, creating it on first use"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(redis_url or os.environ.get('REDIS_URL'))
+    return _single_flight
+
+
+def get_single_flight_stats():
+    """Stats of the single-flight group, or None if it hasn't been used in this process"""
+    return _single_flight.get_stats() if _single_flight is not None else None
@@ -0,0 +1,175 @@
+import base64
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+from flask import current_app
+from services.shopify_service import ShopifyService
+from services.catalog_store import get_catalog_store
+from services.rollup_store import get_rollup_store
+from services.analytics_cache import get_analytics_cache
+from services.client_registry import get_client_registry
+
+# Topics the app subscribes to
+WEBHOOK_TOPICS = (
+    'products/create',
+    'products/update',
+    'products/delete',
+    'orders/create',
+    'orders/updated',
+    'themes/publish'
+)
+
+# Webhook ids remembered to drop Shopify's redeliveries of the same event
+SEEN_WEBHOOK_IDS = 1024
+
+
+def compute_hmac(secret, body):
+    """Base64 HMAC-SHA256 of a raw webhook body, as sent in X-Shopify-Hmac-Sha256"""
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def verify_hmac(secret, body, received):
+    """Check a webhook signature in constant time"""
+    if not secret or not received:
+        return False
+    return hmac.compare_digest(compute_hmac(secret, body), received)
+
+
+class WebhookService:
+    """Apply Shopify webhook events to the local mirror, rollups and caches
+
+    Each event updates the local state it affects and drops the store's cached
+    analytics, so caches stay correct between syncs instead of relying on TTLs.
+    """
+
+    def __init__(self):
+        self._seen = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._handlers = {
+            'products/create': self._product_changed,
+            'products/update': self._product_changed,
+            'products/delete': self._product_deleted,
+            'orders/create': self._order_changed,
+            'orders/updated': self._order_changed,
+            'themes/publish': self._theme_published
+        }
+
+    def _first_delivery(self, webhook_id):
+        """Claim a webhook id, returning False if it was already processed or is being processed"""
+        if not webhook_id:
+            return True
+        with self._seen_lock:
+            if webhook_id in self._seen:
+                return False
+            self._seen[webhook_id] = True
+            while len(self._seen) > SEEN_WEBHOOK_IDS:
+                self._seen.popitem(last=False)
+        return True
+
+    def _forget_delivery(self, webhook_id):
+        """Release a claimed webhook id so Shopify's retry of a failed delivery is applied"""
+        if not webhook_id:
+            return
+        with self._seen_lock:
+            self._seen.pop(webhook_id, None)
+
+    def handle(self, topic, store, payload, webhook_id=None):
+        """Apply one webhook event
+
+        Args:
+            topic (str): X-Shopify-Topic
+            store (str): X-Shopify-Shop-Domain
+            payload (dict): Parsed webhook body
+            webhook_id (str): X-Shopify-Webhook-Id, used to skip redeliveries
+
+        Returns:
+            str: 'applied', 'duplicate' or 'ignored'
+        """
+        handler = self._handlers.get(topic)
+        if handler is None:
+            current_app.logger.info(f"Ignoring unsupported webhook topic {topic} from {store}")
+            return 'ignored'
+        if not self._first_delivery(webhook_id):
+            return 'duplicate'
+
+        try:
+            handler(store, payload)
+            self._invalidate_analytics(store)
+        except Exception:
+            self._forget_delivery(webhook_id)
+            raise
+        return 'applied'
+
+    def _invalidate_analytics(self, store):
+        if current_app.config.get('ANALYTICS_CACHE_ENABLED', True):
+            get_analytics_cache(
+                current_app.config.get('REDIS_URL'),
+                ttl=current_app.config.get('ANALYTICS_CACHE_TTL'),
+                maxsize=current_app.config.get('ANALYTICS_CACHE_SIZE')
+            ).invalidate(store)
+
+    @staticmethod
+    def _catalog():
+        if not current_app.config.get('CATALOG_MIRROR_ENABLED', True):
+            return None
+        return get_catalog_store(current_app.config.get('CATALOG_DB_PATH'))
+
+    @staticmethod
+    def _drop_responses(store, predicate):
+        """Forget matching conditional-GET bodies of a store, shared and per-client"""
+        prefix = f"https://{store}/"
+        caches = [ShopifyService._validator_cache]
+        client = get_client_registry().peek(store)
+        if client is not None:
+            caches.append(client._validator_cache)
+        for cache in caches:
+            cache.invalidate_matching(lambda url: url.startswith(prefix) and predicate(url))
+
+    def _drop_product_responses(self, store, product_id):
+        """Forget conditional-GET bodies of a product and of the product list"""
+        self._drop_responses(
+            store, lambda url: f"/products/{product_id}" in url or url.endswith('/products.json')
+        )
+
+    def _product_changed(self, store, payload):
+        catalog = self._catalog()
+        if catalog is not None:
+            catalog.upsert_products(store, [ShopifyService()._normalize_product(payload)])
+        self._drop_product_responses(store, payload['id'])
+        current_app.logger.info(f"Webhook: product {payload['id']} changed on {store}")
+
+    def _product_deleted(self, store, payload):
+        catalog = self._catalog()
+        if catalog is not None:
+            catalog.delete_products(store, [payload['id']])
+        self._drop_product_responses(store, payload['id'])
+        current_app.logger.info(f"Webhook: product {payload['id']} deleted on {store}")
+
+    def _order_changed(self, store, payload):
+        if current_app.config.get('ORDER_ROLLUPS_ENABLED', True):
+            rollups = get_rollup_store(current_app.config.get('CATALOG_DB_PATH'))
+            # Only fold into stores that were backfilled; otherwise the first refresh covers it
+            if rollups.get_state(store):
+                rollups.apply_orders(store, [payload])
+        current_app.logger.info(f"Webhook: order {payload.get('id')} changed on {store}")
+
+    def _theme_published(self, store, payload):
+        ShopifyService.remember_active_theme(store, payload if payload.get('role') == 'main' else None)
+        self._drop_responses(store, lambda url: '/themes' in url)
+        current_app.logger.info(f"Webhook: theme {payload.get('id')} published on {store}")
+
+
+_webhook_service = None
+_webhook_service_lock = threading.Lock()
+
+
+def get_webhook_service():
+    """Get the process-wide webhook service"""
+    global _webhook_service
+    if _webhook_service is None:
+        with _webhook_service_lock:
+            if _webhook_service is None:
+                _webhook_service = WebhookService()
+    return _webhook_service
@@ -522,7 +522,10 @@ class ProductGrid {
     async updateGrid() {
         try {
             console.log('🔄 Refreshing product grid...');
-            const response = await fetch('/api/products');
+            // Reload only the page being shown, with the same page size as the server-rendered grid
+            const page = this.container?.dataset.page || new URLSearchParams(window.location.search).get('page') || 1;
+            const pageSize = this.container?.dataset.pageSize || 48;
+            const response = await fetch(`/api/products/?page=${encodeURIComponent(page)}&limit=${encodeURIComponent(pageSize)}`);
             if (!response.ok) {
                 throw new Error('Failed to fetch products');
             }
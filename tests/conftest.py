@@ -0,0 +1,38 @@
+import pytest
+from flask import Flask
+import services.analytics_cache as analytics_cache
+import services.analytics_service as analytics_service
+import services.catalog_store as catalog_store
+import services.client_registry as client_registry
+import services.rollup_store as rollup_store
+import services.single_flight as single_flight
+import services.webhook_service as webhook_service
+from services.shopify_service import ShopifyService
+
+STORE = 'test-store.myshopify.com'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Minimal app bound to a throwaway SQLite database and fresh process-wide singletons"""
+    db_path = str(tmp_path / 'catalog.sqlite3')
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        SHOP_URL=STORE,
+        ACCESS_TOKEN='token',
+        CATALOG_DB_PATH=db_path,
+        SHOPIFY_WEBHOOK_SECRET='webhook-secret',
+        PREWARM_ENABLED=False
+    )
+    monkeypatch.setattr(catalog_store, '_catalog_store', catalog_store.CatalogStore(db_path))
+    monkeypatch.setattr(rollup_store, '_rollup_store', rollup_store.OrderRollupStore(db_path))
+    monkeypatch.setattr(analytics_cache, '_analytics_cache', analytics_cache.AnalyticsCache())
+    monkeypatch.setattr(analytics_service, '_rollup_locks', {})
+    monkeypatch.setattr(webhook_service, '_webhook_service', None)
+    monkeypatch.setattr(client_registry, '_registry', None)
+    monkeypatch.setattr(single_flight, '_single_flight', None)
+    monkeypatch.setattr(ShopifyService, '_active_themes', {})
+    monkeypatch.setattr(ShopifyService, '_catalog_sync_locks', {})
+    return app
@@ -0,0 +1,76 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+import requests
+from services.analytics_service import AnalyticsService
+from services.shopify_http import deadline_timeout, request_deadline
+from services.shopify_service import ShopifyService
+
+
+def daily_metrics(days):
+    start = datetime(2025, 1, 1)
+    return [
+        {'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'), 'orders': i % 7, 'revenue': float(i % 11), 'units': i % 5}
+        for i in range(days)
+    ]
+
+
+def test_dashboard_summary_downsamples_chart_series(app, monkeypatch):
+    series = daily_metrics(365)
+    monkeypatch.setattr(AnalyticsService, 'get_snapshot', lambda self, time_range='30d': None)
+    monkeypatch.setattr(AnalyticsService, 'get_product_analytics', lambda self, time_range, snapshot=None: {'summary': {}})
+    monkeypatch.setattr(AnalyticsService, 'get_order_analytics', lambda self, time_range, snapshot=None: {'summary': {'total_orders': 1}, 'daily_metrics': series})
+    monkeypatch.setattr(AnalyticsService, 'get_theme_analytics', lambda self, time_range, snapshot=None: {'summary': {}})
+    monkeypatch.setattr(AnalyticsService, 'get_store_performance', lambda self, time_range, snapshot=None: {'traffic': {}})
+
+    with app.test_request_context():
+        service = AnalyticsService(ShopifyService())
+        summary = service.get_dashboard_summary('1y', max_points=50)
+        assert summary['orders'] == {'total_orders': 1}
+        assert len(summary['daily_metrics']) == 50
+        assert summary['daily_metrics'][0] == series[0]
+        assert summary['daily_metrics'][-1] == series[-1]
+
+        # The cached summary keeps the full series for other resolutions
+        assert len(service.get_dashboard_summary('1y')['daily_metrics']) == 365
+
+
+def test_deadline_shrinks_and_then_stops_calls():
+    assert deadline_timeout((5, 30)) == (5, 30)
+    with request_deadline(1):
+        connect, read = deadline_timeout((5, 30))
+        assert 0 < connect <= 1 and 0 < read <= 1
+        with request_deadline(10):
+            assert deadline_timeout((5, 30))[1] <= 1  # Nested deadlines never extend
+    with request_deadline(0):
+        with pytest.raises(requests.Timeout):
+            deadline_timeout()
+
+
+def test_hung_section_stops_at_its_deadline(app, monkeypatch):
+    stopped = threading.Event()
+
+    def slow_themes(self, time_range, snapshot=None):
+        # Stands in for a section paging through a slow Shopify
+        try:
+            while True:
+                deadline_timeout()
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    monkeypatch.setattr(AnalyticsService, 'get_snapshot', lambda self, time_range='30d': None)
+    monkeypatch.setattr(AnalyticsService, 'get_product_analytics', lambda self, time_range, snapshot=None: {'summary': {}})
+    monkeypatch.setattr(AnalyticsService, 'get_order_analytics', lambda self, time_range, snapshot=None: {'summary': {}, 'daily_metrics': []})
+    monkeypatch.setattr(AnalyticsService, 'get_theme_analytics', slow_themes)
+    monkeypatch.setattr(AnalyticsService, 'get_store_performance', lambda self, time_range, snapshot=None: {'traffic': {}})
+    app.config['ANALYTICS_SECTION_DEADLINES'] = {'themes': 0.2}
+
+    with app.test_request_context():
+        summary = AnalyticsService(ShopifyService())._build_dashboard_summary('30d')
+
+    assert summary['sections']['themes']['status'] in ('timeout', 'error')
+    assert summary['sections']['products'] == {'status': 'ok'}
+    # The section's thread gave up by itself instead of holding a worker
+    assert stopped.wait(1)
@@ -0,0 +1,22 @@
+import threading
+import pytest
+from services.bulk_delete import BulkDeleteJobs
+from services.shopify_service import ShopifyService
+
+
+@pytest.mark.parametrize('product_ids', [[1, 'abc'], [0], ['-5'], [1.5], [None], ['١٢']])
+def test_rejects_invalid_ids_before_queueing(app, monkeypatch, product_ids):
+    jobs = BulkDeleteJobs()
+    monkeypatch.setattr(threading.Thread, 'start', lambda self: pytest.fail("job was queued"))
+    with app.app_context():
+        with pytest.raises(ValueError, match='positive integers'):
+            jobs.start(ShopifyService(), product_ids)
+    assert not jobs._jobs
+
+
+def test_normalizes_and_dedups_ids(app, monkeypatch):
+    jobs = BulkDeleteJobs()
+    monkeypatch.setattr(threading.Thread, 'start', lambda self: None)
+    with app.app_context():
+        job = jobs.start(ShopifyService(), [12, '12', ' 007 ', 7])
+    assert job.product_ids == ['12', '7']
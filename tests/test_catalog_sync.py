@@ -0,0 +1,68 @@
+import threading
+import time
+import pytest
+from services.catalog_store import get_catalog_store
+from services.shopify_service import ShopifyService
+from tests.conftest import STORE
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake Shopify catalog that counts (and slows down) full product pagination"""
+    calls = []
+    catalog = {'products': [{'id': 1, 'title': 'A', 'updated_at': '2026-01-01T00:00:00Z', 'variants': []}]}
+
+    def iter_product_pages(self, page_size=250, fields=None, **filters):
+        calls.append(filters)
+        time.sleep(0.2)
+        yield [dict(product) for product in catalog['products']]
+
+    monkeypatch.setattr(ShopifyService, 'iter_product_pages', iter_product_pages)
+    return calls, catalog
+
+
+def run_threads(app, target, count=5):
+    results = []
+
+    def worker():
+        with app.app_context():
+            results.append(target())
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_first_sync_runs_once(app, upstream):
+    calls, _ = upstream
+    service = ShopifyService()
+    results = run_threads(app, service.get_products)
+
+    assert len(calls) == 1
+    assert all([product['id'] for product in products] == [1] for products in results)
+
+
+def test_stale_mirror_is_served_while_refreshing_in_background(app, upstream):
+    calls, catalog = upstream
+    service = ShopifyService()
+    with app.app_context():
+        service.get_products()
+        catalog['products'][0].update(title='B', updated_at='2026-01-02T00:00:00Z')
+        app.config['CATALOG_SYNC_INTERVAL'] = 0
+
+    started = time.monotonic()
+    results = run_threads(app, service.get_products)
+    elapsed = time.monotonic() - started
+
+    # Nobody waited for the refresh and only one was started
+    assert elapsed < 0.2
+    assert all(products[0]['title'] == 'A' for products in results)
+    lock = ShopifyService._catalog_sync_lock(STORE)
+    deadline = time.monotonic() + 2
+    while lock.locked() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 2
+    assert get_catalog_store().get_product(STORE, 1)['title'] == 'B'
@@ -0,0 +1,72 @@
+from unittest.mock import MagicMock
+import pytest
+from flask import session
+from services.client_registry import ShopifyClientRegistry, StoreDisconnectedError, normalize_store
+from tests.conftest import STORE
+
+OTHER_STORE = 'other-store.myshopify.com'
+
+
+def test_normalize_store():
+    assert normalize_store('https://Other-Store.myshopify.com/') == OTHER_STORE
+    assert normalize_store(' other-store.myshopify.com ') == OTHER_STORE
+
+
+def test_current_uses_server_side_token(app):
+    registry = ShopifyClientRegistry()
+    with app.test_request_context():
+        registry.connect(OTHER_STORE, 'other-token')
+        session['store_url'] = OTHER_STORE
+
+        service = registry.current()
+        assert service._store_key() == OTHER_STORE
+        assert service.access_token == 'other-token'
+        assert 'store_access_token' not in session
+
+
+def test_unknown_store_is_reported_disconnected(app):
+    registry = ShopifyClientRegistry()
+    with app.test_request_context():
+        session['store_url'] = OTHER_STORE
+        with pytest.raises(StoreDisconnectedError):
+            registry.current()
+
+
+def test_no_store_in_session_uses_configured_store(app):
+    registry = ShopifyClientRegistry()
+    with app.test_request_context():
+        assert registry.current()._store_key() == STORE
+
+
+def test_token_reloaded_for_the_logged_in_user(app):
+    table = MagicMock()
+    table.select.return_value.eq.return_value.execute.return_value.data = [
+        {'shopify_store_url': OTHER_STORE, 'shopify_api_key': 'saved-token'}
+    ]
+    app.supabase = MagicMock()
+    app.supabase.table.return_value = table
+    registry = ShopifyClientRegistry()
+    with app.test_request_context():
+        session['user'] = {'id': 'user-1'}
+        session['store_url'] = OTHER_STORE
+        assert registry.current().access_token == 'saved-token'
+    table.select.return_value.eq.assert_called_with('id', 'user-1')
+
+
+def test_remove_forgets_token(app):
+    registry = ShopifyClientRegistry()
+    with app.test_request_context():
+        registry.connect(OTHER_STORE, 'other-token')
+        assert registry.remove(OTHER_STORE)
+        assert registry.token(OTHER_STORE) is None
+        assert registry.peek(OTHER_STORE) is None
+
+
+def test_token_survives_idle_eviction(app):
+    registry = ShopifyClientRegistry(idle_timeout=0)
+    with app.test_request_context():
+        registry.connect(OTHER_STORE, 'other-token')
+        registry.default()  # Evicts the idle client of the other store
+        assert registry.peek(OTHER_STORE) is None
+        session['store_url'] = OTHER_STORE
+        assert registry.current().access_token == 'other-token'
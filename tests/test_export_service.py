@@ -0,0 +1,40 @@
+import json
+import pytest
+from services.export_service import ORDER_EXPORT_FIELDS, iter_csv, iter_export, iter_guarded, iter_ndjson
+
+
+def failing_orders():
+    yield {'id': 1, 'name': '#1001', 'email': 'a@example.com', 'total_price': '10.00'}
+    raise RuntimeError('Shopify returned 502')
+
+
+def test_order_defaults_leave_out_customer_data():
+    assert not {'email', 'customer', 'billing_address', 'shipping_address', 'phone'} & set(ORDER_EXPORT_FIELDS)
+    records = [{'id': 1, 'name': '#1001', 'email': 'a@example.com'}]
+    lines = ''.join(iter_export(records, 'ndjson', ORDER_EXPORT_FIELDS)).splitlines()
+    assert 'email' not in json.loads(lines[0])
+
+
+def test_ndjson_ends_with_error_record_on_upstream_failure():
+    errors = []
+    chunks = iter_guarded(iter_ndjson(failing_orders(), ('id', 'name'), chunk_rows=1), 'ndjson', errors.append)
+    lines = [json.loads(line) for line in ''.join(chunks).splitlines()]
+
+    assert lines == [{'id': 1, 'name': '#1001'}, {'error': 'Shopify returned 502', 'complete': False}]
+    assert len(errors) == 1
+
+
+def test_csv_aborts_on_upstream_failure():
+    errors = []
+    chunks = iter_guarded(iter_csv(failing_orders(), ('id', 'name'), chunk_rows=1), 'csv', errors.append)
+
+    assert next(chunks) == 'id,name\r\n'
+    assert next(chunks) == '1,#1001\r\n'
+    with pytest.raises(RuntimeError):
+        next(chunks)
+    assert len(errors) == 1
+
+
+def test_rows_buffered_before_a_failure_are_sent():
+    chunks = iter_guarded(iter_ndjson(failing_orders(), ('id',)), 'ndjson')
+    assert ''.join(chunks).splitlines()[0] == '{"id": 1}'
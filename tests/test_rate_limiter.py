@@ -0,0 +1,57 @@
+import threading
+import time
+from services.rate_limiter import LeakyBucketLimiter
+
+
+def test_reserve_paces_after_headroom():
+    limiter = LeakyBucketLimiter('store', capacity=40, headroom=4)
+    waits = [limiter.reserve() for _ in range(37)]
+    assert waits[:36] == [0.0] * 36
+    assert waits[36] > 0
+
+
+def test_other_callers_wait_out_retry_after():
+    limiter = LeakyBucketLimiter('store', capacity=40, headroom=4)
+    limiter.reserve()
+
+    # One caller gets a 429 with Retry-After: 1
+    delay = limiter.backoff_delay(0, '1')
+    assert delay >= 1.0
+
+    # A second caller asking meanwhile must not be sent during the backoff
+    wait = limiter.reserve()
+    assert wait >= delay - 0.05
+    # and a third queues behind it
+    assert limiter.reserve() > wait
+
+
+def test_two_threads_across_retry_after():
+    limiter = LeakyBucketLimiter('store', capacity=40, headroom=4)
+    sent = {}
+    started = time.monotonic()
+
+    def throttled_caller():
+        time.sleep(limiter.backoff_delay(0, '0.5'))
+        limiter.acquire()
+        sent['retry'] = time.monotonic() - started
+
+    def other_caller():
+        time.sleep(0.1)
+        limiter.acquire()
+        sent['other'] = time.monotonic() - started
+
+    threads = [threading.Thread(target=throttled_caller), threading.Thread(target=other_caller)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sent['other'] >= 0.5
+    assert sent['retry'] >= 0.5
+
+
+def test_hold_expires():
+    limiter = LeakyBucketLimiter('store', capacity=40, headroom=4)
+    time.sleep(limiter.backoff_delay(0, '0.1') + 0.05)
+    assert limiter.reserve() < 0.1
+    assert limiter.get_state()['blocked_for'] == 0.0
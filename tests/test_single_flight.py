@@ -0,0 +1,125 @@
+import threading
+import time
+import pytest
+from services.single_flight import SingleFlight, SHARE_LOCK, SHARE_LOCAL, KEY_PREFIX
+
+
+class FakeRedis:
+    """The handful of Redis commands SingleFlight uses, in memory"""
+
+    def __init__(self):
+        self.data = {}
+        self.writes = []
+        self._lock = threading.Lock()
+
+    def set(self, key, value, nx=False, ex=None):
+        with self._lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            return True
+
+    def setex(self, key, ttl, value):
+        with self._lock:
+            self.writes.append(key)
+            self.data[key] = value.encode()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def run_concurrently(*targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def slow(value, calls, delay=0.2):
+    def fn():
+        calls.append(value)
+        time.sleep(delay)
+        return value
+    return fn
+
+
+def test_concurrent_callers_share_one_call(app):
+    flight = SingleFlight()
+    calls, results = [], []
+    with app.app_context():
+        run_concurrently(*[lambda: results.append(flight.do('k', slow([1], calls)))] * 5)
+    assert len(calls) == 1
+    assert results == [[1]] * 5
+
+
+def test_error_is_raised_to_every_waiter(app):
+    flight = SingleFlight()
+    errors = []
+
+    def fail():
+        time.sleep(0.2)
+        raise ValueError('boom')
+
+    def call():
+        try:
+            flight.do('k', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    run_concurrently(*[call] * 3)
+    assert len(errors) == 3
+    assert flight.get_stats()['calls'] == 1
+
+
+def test_result_is_published_to_other_workers(app):
+    redis = FakeRedis()
+    leader, follower = SingleFlight(), SingleFlight()
+    leader._redis = follower._redis = redis
+    calls, results = [], {}
+
+    def lead():
+        with app.app_context():
+            results['leader'] = leader.do('k', slow({'themes': []}, calls))
+
+    def follow():
+        time.sleep(0.05)
+        with app.app_context():
+            results['follower'] = follower.do('k', slow('unexpected', calls))
+
+    run_concurrently(lead, follow)
+    assert calls == [{'themes': []}]
+    assert results == {'leader': {'themes': []}, 'follower': {'themes': []}}
+
+
+@pytest.mark.parametrize('share', [SHARE_LOCK, SHARE_LOCAL])
+def test_lock_and_local_flights_never_publish(app, share):
+    redis = FakeRedis()
+    flight = SingleFlight()
+    flight._redis = redis
+    with app.app_context():
+        assert flight.do('k', lambda: ['catalog'], share=share) == ['catalog']
+    assert not [key for key in redis.writes if key.startswith(KEY_PREFIX)]
+
+
+def test_lock_flight_followers_wait_then_run_locally(app):
+    redis = FakeRedis()
+    leader, follower = SingleFlight(), SingleFlight()
+    leader._redis = follower._redis = redis
+    events = []
+
+    def lead():
+        with app.app_context():
+            leader.do('sync', lambda: (events.append('sync start'), time.sleep(0.2), events.append('sync end')), share=SHARE_LOCK)
+
+    def follow():
+        time.sleep(0.05)
+        with app.app_context():
+            follower.do('sync', lambda: events.append('follower read'), share=SHARE_LOCK)
+
+    run_concurrently(lead, follow)
+    assert events == ['sync start', 'sync end', 'follower read']
+    assert not redis.writes
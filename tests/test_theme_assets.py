@@ -0,0 +1,58 @@
+import pytest
+from services.shopify_service import ShopifyService
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.fixture
+def shop(app, monkeypatch):
+    """Store whose assets.json answers 404 on theme 1 and 200 on theme 2"""
+    calls = {'themes': 0, 'assets': []}
+    live = {'id': 1}
+
+    def get_themes(self):
+        calls['themes'] += 1
+        return [{'id': live['id'], 'role': 'main'}]
+
+    def request(self, method, url, **kwargs):
+        calls['assets'].append((method, url.split('/themes/')[1]))
+        return FakeResponse(404 if '/themes/1/' in url else 200)
+
+    monkeypatch.setattr(ShopifyService, 'get_themes', get_themes)
+    monkeypatch.setattr(ShopifyService, '_request', request)
+    with app.app_context():
+        service = ShopifyService()
+        service._init_config()
+        service._cache_active_theme({'id': 1, 'role': 'main'})
+        yield service, calls, live
+
+
+@pytest.mark.parametrize('method', ['GET', 'DELETE'])
+def test_missing_asset_does_not_refetch_themes(shop, method):
+    service, calls, _ = shop
+    response, theme = service._theme_asset_request(method, params={'asset[key]': 'templates/product.x.json'})
+    assert response.status_code == 404
+    assert theme['id'] == 1
+    assert calls['themes'] == 0
+    assert len(calls['assets']) == 1
+
+
+def test_put_retries_on_newly_published_theme(shop):
+    service, calls, live = shop
+    live['id'] = 2
+    response, theme = service._theme_asset_request('PUT', payload={'asset': {'key': 'k'}})
+    assert response.status_code == 200
+    assert theme['id'] == 2
+    assert calls['themes'] == 1
+    assert [method for method, _ in calls['assets']] == ['PUT', 'PUT']
+
+
+def test_put_on_unchanged_theme_is_not_retried(shop):
+    service, calls, _ = shop
+    response, theme = service._theme_asset_request('PUT', payload={'asset': {'key': 'k'}})
+    assert response.status_code == 404
+    assert calls['themes'] == 1
+    assert len(calls['assets']) == 1
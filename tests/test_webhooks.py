@@ -0,0 +1,153 @@
+import json
+import pytest
+from routes.webhooks import webhooks_bp
+from services.analytics_cache import get_analytics_cache
+from services.catalog_store import get_catalog_store
+from services.rollup_store import get_rollup_store
+from services.shopify_service import ShopifyService
+from services.webhook_service import compute_hmac, verify_hmac, get_webhook_service
+from tests.conftest import STORE
+
+
+@pytest.fixture
+def client(app):
+    app.register_blueprint(webhooks_bp)
+    return app.test_client()
+
+
+def deliver(client, topic, payload, webhook_id=None, secret='webhook-secret', signature=None):
+    body = json.dumps(payload).encode()
+    headers = {
+        'X-Shopify-Topic': topic,
+        'X-Shopify-Shop-Domain': STORE,
+        'X-Shopify-Hmac-Sha256': signature or compute_hmac(secret, body)
+    }
+    if webhook_id:
+        headers['X-Shopify-Webhook-Id'] = webhook_id
+    return client.post('/webhooks/shopify', data=body, headers=headers)
+
+
+def product(product_id, title, updated_at):
+    return {'id': product_id, 'title': title, 'updated_at': updated_at, 'variants': [], 'images': []}
+
+
+def test_verify_hmac():
+    body = b'{"id": 1}'
+    signature = compute_hmac('secret', body)
+    assert verify_hmac('secret', body, signature)
+    assert not verify_hmac('secret', body + b' ', signature)
+    assert not verify_hmac('other', body, signature)
+    assert not verify_hmac(None, body, signature)
+    assert not verify_hmac('secret', body, None)
+
+
+def test_rejects_bad_signature(client, app):
+    response = deliver(client, 'products/create', product(1, 'A', '2024-01-01'), secret='wrong')
+    assert response.status_code == 401
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1) is None
+
+
+def test_rejects_tampered_body(client, app):
+    signature = compute_hmac('webhook-secret', json.dumps(product(1, 'A', '2024-01-01')).encode())
+    response = deliver(client, 'products/create', product(1, 'B', '2024-01-01'), signature=signature)
+    assert response.status_code == 401
+
+
+def test_rejects_missing_headers(client):
+    body = b'{}'
+    response = client.post('/webhooks/shopify', data=body, headers={
+        'X-Shopify-Hmac-Sha256': compute_hmac('webhook-secret', body)
+    })
+    assert response.status_code == 400
+
+
+def test_product_upsert_and_delete(client, app):
+    assert deliver(client, 'products/create', product(1, 'A', '2024-01-01')).get_json() == {'status': 'applied'}
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1)['title'] == 'A'
+
+    deliver(client, 'products/update', product(1, 'B', '2024-02-01'))
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1)['title'] == 'B'
+
+    deliver(client, 'products/delete', {'id': 1})
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1) is None
+
+
+def test_late_product_update_does_not_roll_back(client, app):
+    deliver(client, 'products/update', product(1, 'New', '2024-02-01'))
+    deliver(client, 'products/update', product(1, 'Old', '2024-01-01'))
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1)['title'] == 'New'
+
+
+def test_update_after_delete_does_not_resurrect(client, app):
+    deliver(client, 'products/create', product(1, 'A', '2024-01-01T00:00:00-05:00'))
+    deliver(client, 'products/delete', {'id': 1})
+    deliver(client, 'products/update', product(1, 'Stale', '2024-01-02T00:00:00-05:00'))
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1) is None
+
+    deliver(client, 'products/update', product(1, 'Restored', '2999-01-01T00:00:00Z'))
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1)['title'] == 'Restored'
+
+
+def test_order_folds_into_backfilled_rollups(client, app):
+    with app.app_context():
+        get_rollup_store().set_state(STORE, '2024-01-01T00:00:00Z')
+    order = {
+        'id': 10, 'created_at': '2024-05-01T10:00:00Z', 'updated_at': '2024-05-01T10:00:00Z',
+        'total_price': '12.50', 'line_items': [{'quantity': 3}]
+    }
+    assert deliver(client, 'orders/create', order).status_code == 200
+    with app.app_context():
+        assert get_rollup_store().get_daily(STORE, '2024-05-01', '2024-05-01') == [
+            {'day': '2024-05-01', 'orders': 1, 'revenue': 12.5, 'units': 3}
+        ]
+
+
+def test_theme_publish_updates_active_theme(client):
+    deliver(client, 'themes/publish', {'id': 7, 'role': 'main'})
+    assert ShopifyService._active_themes[STORE][0]['id'] == 7
+
+
+def test_event_invalidates_analytics_cache(client, app):
+    with app.app_context():
+        cache = get_analytics_cache()
+        key = cache.make_key(STORE, 'products', '30d', 'fp')
+        cache.set(key, {'total': 1})
+    deliver(client, 'products/create', product(1, 'A', '2024-01-01'))
+    with app.app_context():
+        assert cache.get(key) is None
+
+
+def test_unsupported_topic_is_ignored(client):
+    assert deliver(client, 'shop/update', {}).get_json() == {'status': 'ignored'}
+
+
+def test_redelivery_is_skipped(client, app):
+    assert deliver(client, 'products/create', product(1, 'A', '2024-01-01'), 'w1').get_json() == {'status': 'applied'}
+    with app.app_context():
+        get_catalog_store().delete_products(STORE, [1])
+    assert deliver(client, 'products/create', product(1, 'A', '2024-01-01'), 'w1').get_json() == {'status': 'duplicate'}
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1) is None
+
+
+def test_retry_after_failure_is_applied(client, app, monkeypatch):
+    service = get_webhook_service()
+    original = service._handlers['products/create']
+
+    def failing(store, payload):
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setitem(service._handlers, 'products/create', failing)
+    assert deliver(client, 'products/create', product(1, 'A', '2024-01-01'), 'w2').status_code == 500
+
+    monkeypatch.setitem(service._handlers, 'products/create', original)
+    assert deliver(client, 'products/create', product(1, 'A', '2024-01-01'), 'w2').get_json() == {'status': 'applied'}
+    with app.app_context():
+        assert get_catalog_store().get_product(STORE, 1)['title'] == 'A'